@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.transactions'
+
+    def ready(self):
+        """
+        Registers the signal receivers of the transactions app.
+        """
+        from apps.transactions import signals  # noqa: F401
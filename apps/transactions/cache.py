@@ -0,0 +1,58 @@
+import hashlib
+
+from apps.users.cache import get_client, get_response_version
+from apps.utils.cache import MeteredCache
+
+validation_cache = MeteredCache(namespace="validation", alias="validation")
+
+
+def content_hash(value):
+    """
+    Computes the SHA-256 of an image as received, without decoding it.
+
+    Args:
+        value (str or File): A base64 data URI (only the base64 data is hashed) or an uploaded file.
+
+    Returns:
+        str: The hexadecimal digest, or None if the value is not an image payload.
+    """
+    sha256 = hashlib.sha256()
+    if isinstance(value, str):
+        start = value.find(";base64,")
+        sha256.update(value[start + len(";base64,") if start != -1 else 0 :].encode())
+    elif hasattr(value, "chunks"):
+        for chunk in value.chunks():
+            sha256.update(chunk)
+        value.seek(0)
+    else:
+        return None
+    return sha256.hexdigest()
+
+
+def validation_cache_key(data):
+    """
+    Builds the validation cache key of a validate request.
+
+    Args:
+        data (dict): The request data with the `client`, `frontside_image` and `backside_image` fields.
+
+    The key includes the version of the client kept by the users app, which every write of the client (creation,
+    update, soft delete) replaces, so a result depending on the client, "Invalid client" for an id created a moment
+    later for example, is never served after the client changed.
+
+    Requests for a client id that `get_client` does not resolve are not cached, so they never create a version key for
+    an id that does not exist.
+
+    Returns:
+        str: The key made of the client id and version and the hashes of both images, or None if any of them is
+        missing or the client does not exist.
+    """
+    client = data.get("client")
+    frontside_hash = content_hash(data.get("frontside_image"))
+    backside_hash = content_hash(data.get("backside_image"))
+    if not str(client).isdigit() or frontside_hash is None or backside_hash is None:
+        return None
+    if get_client(int(client)) is None:
+        return None
+    client_version = get_response_version(int(client))
+    return f"{client}:{client_version}:{frontside_hash}:{backside_hash}"
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from apps.transactions.serializers import transaction_values
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Reads the transactions to export as the dicts `TransactionReadSerializer` would return for them.
+
+    Only the exported columns are read, with `QuerySet.iterator`, so the rows are fetched `chunk_size` at a time
+    (through a server-side cursor on PostgreSQL) and never held all in memory. They are converted by
+    `transaction_values`, the fast read path of `TransactionReadSerializer`.
+
+    Args:
+        queryset (QuerySet): The transactions to export.
+        chunk_size (int, optional): The number of rows fetched from the database at a time.
+
+    Returns:
+        generator: The transaction dicts.
+    """
+    return transaction_values.iter_representation(transaction_values.values(queryset).iterator(chunk_size=chunk_size))
+
+
+def stream_ndjson(rows, batch_size=EXPORT_CHUNK_SIZE):
+    """
+    Encodes rows as newline-delimited JSON, yielding `batch_size` lines at a time.
+
+    Args:
+        rows (iterable): The row dicts.
+        batch_size (int, optional): The number of lines per yielded string.
+
+    Returns:
+        generator: The NDJSON chunks.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, separators=(",", ":")))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def stream_csv(rows, batch_size=EXPORT_CHUNK_SIZE):
+    """
+    Encodes rows as CSV with a header line, yielding `batch_size` lines at a time.
+
+    Args:
+        rows (iterable): The row dicts.
+        batch_size (int, optional): The number of lines per yielded string.
+
+    Returns:
+        generator: The CSV chunks.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=transaction_values.field_names)
+    writer.writeheader()
+    for index, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if index % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,118 @@
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from apps.transactions.models import ErrorCodeChoices
+
+
+class TransactionFilterSerializer(serializers.Serializer):
+    """
+    A serializer for validating the query parameters that filter the transactions list.
+
+    Inputs:
+    - client: The client id.
+    - result: The validation result, true or false.
+    - error_code: The error code of failed transactions.
+    - created_after: The ISO 8601 date and time from which transactions are listed, inclusive.
+    - created_before: The ISO 8601 date and time until which transactions are listed, exclusive.
+
+    Outputs:
+    - An instance of TransactionFilterSerializer whose validated data has the received filters.
+    """
+
+    client = serializers.IntegerField(required=False, min_value=1)
+    result = serializers.BooleanField(required=False, allow_null=True, default=None)
+    error_code = serializers.ChoiceField(required=False, choices=ErrorCodeChoices.choices)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        """
+        Rejects filtering successful transactions by error code, only failed transactions have one.
+
+        Inputs:
+        - attrs: The validated filters.
+
+        Outputs:
+        - The validated filters.
+        """
+        if "error_code" in attrs and attrs["result"]:
+            raise serializers.ValidationError({"error_code": "Only failed transactions have an error code."})
+        return attrs
+
+
+class TransactionFilterBackend(BaseFilterBackend):
+    """
+    Filters the transactions list by the `client`, `result`, `error_code`, `created_after` and `created_before` query
+    parameters.
+
+    Every combination is served by one of the composite indexes of `Transaction`: (`client`, `created_at`, `id`) for
+    the client filter and (`result`, `error_code`, `created_at`, `id`) for the others. As only failed transactions
+    have an error code, filtering by `error_code` also filters by `result=false`, so that index is used from its
+    first column.
+
+    Invalid parameters, and `result=true` with an `error_code`, are answered with a 400 response.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Applies the filters received in the query parameters.
+
+        Inputs:
+        - request: The HTTP request object.
+        - queryset: The transactions queryset, already excluding soft deleted transactions.
+        - view: The view listing the transactions.
+
+        Outputs:
+        - The filtered queryset.
+        """
+        serializer = TransactionFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+        if "client" in filters:
+            queryset = queryset.filter(client_id=filters["client"])
+        if "error_code" in filters:
+            queryset = queryset.filter(result=False, error_code=filters["error_code"])
+        elif filters["result"] is not None:
+            queryset = queryset.filter(result=filters["result"])
+        if "created_after" in filters:
+            queryset = queryset.filter(created_at__gte=filters["created_after"])
+        if "created_before" in filters:
+            queryset = queryset.filter(created_at__lt=filters["created_before"])
+        return queryset
+
+
+class TransactionStatsFilterSerializer(serializers.Serializer):
+    """
+    A serializer for validating the query parameters that filter the validation statistics.
+
+    Inputs:
+    - client: The client id.
+    - date_from: The first day of the statistics, inclusive.
+    - date_to: The last day of the statistics, inclusive.
+
+    Outputs:
+    - An instance of TransactionStatsFilterSerializer whose validated data has the received filters.
+    """
+
+    client = serializers.IntegerField(required=False, min_value=1)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def filter_queryset(self, queryset):
+        """
+        Applies the validated filters to the rollup rows.
+
+        Inputs:
+        - queryset: The `TransactionStat` queryset.
+
+        Outputs:
+        - The filtered queryset.
+        """
+        filters = self.validated_data
+        if "client" in filters:
+            queryset = queryset.filter(client_id=filters["client"])
+        if "date_from" in filters:
+            queryset = queryset.filter(day__gte=filters["date_from"])
+        if "date_to" in filters:
+            queryset = queryset.filter(day__lte=filters["date_to"])
+        return queryset
@@ -0,0 +1,359 @@
+import base64
+import binascii
+import os
+import struct
+import tempfile
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.files import File
+from PIL import Image, ImageOps
+
+MAX_IMAGE_SIZE = 4 * 1024 * 1024
+MAX_IMAGE_WIDTH = 3840
+MAX_IMAGE_HEIGHT = 2160
+HEADER_SIZE = 256 * 1024
+BASE64_CHUNK_SIZE = 256 * 1024
+BASE64_WHITESPACE = " \t\r\n\v\f"
+
+ImageProbe = namedtuple("ImageProbe", ("format", "width", "height"))
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+JPEG_STANDALONE_MARKERS = frozenset((0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8))
+
+
+def probe_image(data):
+    """
+    Detects the format and dimensions of a JPEG, PNG or BMP image reading only its header.
+
+    The pixel data is never decoded: PNG dimensions are read from the IHDR chunk, BMP dimensions from the DIB header
+    and JPEG dimensions from the first SOF marker, skipping the segments before it.
+
+    Args:
+        data (bytes or memoryview): The image bytes.
+
+    Returns:
+        ImageProbe: The image format, width and height, or None if the data is not a JPEG, PNG or BMP image.
+    """
+    view = memoryview(data)
+    try:
+        if view[:8] == PNG_SIGNATURE and view[12:16] == b"IHDR":
+            width, height = struct.unpack_from(">II", view, 16)
+            return ImageProbe("png", width, height)
+        if view[:2] == b"BM":
+            (header_size,) = struct.unpack_from("<I", view, 14)
+            if header_size == 12:
+                width, height = struct.unpack_from("<HH", view, 18)
+            else:
+                width, height = struct.unpack_from("<ii", view, 18)
+            return ImageProbe("bmp", width, abs(height))
+        if view[:2] == b"\xff\xd8":
+            return _probe_jpeg(view)
+    except (struct.error, IndexError):
+        return None
+    return None
+
+
+def _probe_jpeg(view):
+    """
+    Walks the JPEG segments until the first SOF (start of frame) marker.
+
+    Args:
+        view (memoryview): The JPEG bytes.
+
+    Returns:
+        ImageProbe: The JPEG dimensions, or None if no SOF marker is found.
+
+    Raises:
+        struct.error, IndexError: If the data is truncated.
+    """
+    position = 2
+    while position < len(view):
+        if view[position] != 0xFF:
+            return None
+        while view[position] == 0xFF:
+            position += 1
+        marker = view[position]
+        position += 1
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker == 0xD9:
+            return None
+        (length,) = struct.unpack_from(">H", view, position)
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", view, position + 3)
+            return ImageProbe("jpeg", width, height)
+        position += length
+    return None
+
+
+class ImageTooLargeError(ValueError):
+    """
+    Raised when an image is larger than `MAX_IMAGE_SIZE`, before its data is decoded or read, or when its header
+    shows it is larger than `MAX_IMAGE_WIDTH` x `MAX_IMAGE_HEIGHT`, before the rest of its data is decoded.
+    """
+
+    def __init__(self, message=None):
+        super().__init__(message or f"Image too large, must be at most {MAX_IMAGE_SIZE // (1024 * 1024)}MB")
+
+
+def decoded_length(data, start=0):
+    """
+    Computes the length of the bytes encoded in a base64 string without decoding it.
+
+    The line breaks and other whitespace of wrapped (MIME) base64 are not counted.
+
+    Args:
+        data (str): The base64 string.
+        start (int, optional): The position where the base64 data starts, after any data URI header.
+
+    Returns:
+        int: The decoded length in bytes.
+    """
+    encoded_length = len(data) - start - sum(data.count(char, start) for char in BASE64_WHITESPACE)
+    padding = 0
+    tail = data[max(start, len(data) - 8) :].rstrip(BASE64_WHITESPACE)
+    if encoded_length and tail.endswith("=="):
+        padding = 2
+    elif encoded_length and tail.endswith("="):
+        padding = 1
+    return encoded_length * 3 // 4 - padding
+
+
+class DecodedImage:
+    """
+    An uploaded image decoded once and shared by every stage of a validation request.
+
+    The image is decoded from its base64 data URI or read from its uploaded file a single time, and its header is
+    probed a single time with `probe_image` to detect the format and dimensions. PIL is only used by `verify`, once
+    the cheap checks passed. Field parsing, `validate_image`, the storage of successful transactions and
+    `ValidateSerializer.failed()` all work on the same instance.
+
+    Base64 data is decoded in chunks into a spooled temporary file, which stays in memory up to
+    `FILE_UPLOAD_MAX_MEMORY_SIZE` bytes like Django uploads do, and images larger than `MAX_IMAGE_SIZE` are rejected
+    from their length before anything is decoded.
+
+    Attributes:
+    - file: The file with the decoded image bytes.
+    - size: The image size in bytes.
+    - format: The detected image format (jpeg, png or bmp), or None if it is not one of them.
+    - width: The image width in pixels, 0 if the format was not detected.
+    - height: The image height in pixels, 0 if the format was not detected.
+    - name: The file name used to store the image.
+    """
+
+    def __init__(self, file, size, name=None):
+        """
+        DecodedImage class constructor
+
+        Args:
+            file (file object): The file with the decoded image bytes.
+            size (int): The image size in bytes.
+            name (str, optional): The original file name. A random one is generated when not provided.
+        """
+        self.file = file
+        self.size = size
+        self.format, self.width, self.height = self._inspect(file)
+        if name is None:
+            extension = "jpg" if self.format == "jpeg" else self.format or "bin"
+            name = f"{uuid.uuid4()}.{extension}"
+        self.name = name
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Decodes an image received by the validate endpoint.
+
+        Args:
+            data (str or File): A base64 data URI (or bare base64 string), or an uploaded file.
+
+        Raises:
+            ImageTooLargeError: If the image is larger than `MAX_IMAGE_SIZE`.
+            ValueError: If the data is not valid base64 or not a file.
+
+        Returns:
+            DecodedImage: The decoded image.
+        """
+        if isinstance(data, str):
+            return cls.from_base64(data)
+        if hasattr(data, "read"):
+            return cls.from_file(data)
+        raise ValueError("not a base64 string or a file")
+
+    @classmethod
+    def from_base64(cls, data):
+        """
+        Decodes an image from a base64 data URI or a bare base64 string.
+
+        The decoded length is checked before decoding and the data is decoded in chunks, so the decoded image is never
+        held as a single bytes object. The whitespace of wrapped base64 is dropped from every chunk and the characters
+        after its last multiple of 4 are carried over to the next one, so chunks never split a base64 quantum. The
+        header is probed once the first chunk is decoded, and images larger than `MAX_IMAGE_WIDTH` x
+        `MAX_IMAGE_HEIGHT` are rejected without decoding the rest.
+
+        Args:
+            data (str): The base64 encoded image.
+
+        Raises:
+            ImageTooLargeError: If the image is larger than `MAX_IMAGE_SIZE` or its dimensions are larger than
+                `MAX_IMAGE_WIDTH` x `MAX_IMAGE_HEIGHT`.
+            ValueError: If the data is not valid base64.
+
+        Returns:
+            DecodedImage: The decoded image.
+        """
+        start = data.find(";base64,")
+        start = 0 if start == -1 else start + len(";base64,")
+        if decoded_length(data, start) > MAX_IMAGE_SIZE:
+            raise ImageTooLargeError()
+        file = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        pending = ""
+        try:
+            for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+                chunk = pending + "".join(data[offset : offset + BASE64_CHUNK_SIZE].split())
+                end = len(chunk) - len(chunk) % 4
+                decoded = base64.b64decode(chunk[:end])
+                if offset == start:
+                    cls._check_dimensions(decoded, file)
+                file.write(decoded)
+                pending = chunk[end:]
+            file.write(base64.b64decode(pending))
+        except binascii.Error as e:
+            file.close()
+            raise ValueError(f"invalid base64 data, {e}")
+        return cls(file, file.tell())
+
+    @staticmethod
+    def _check_dimensions(header, file):
+        """
+        Rejects an image whose header shows it is larger than `MAX_IMAGE_WIDTH` x `MAX_IMAGE_HEIGHT`.
+
+        Args:
+            header (bytes): The first decoded bytes of the image.
+            file (file object): The file the image is decoded into, closed when the image is rejected.
+
+        Raises:
+            ImageTooLargeError: If the image dimensions are too large.
+        """
+        probe = probe_image(header)
+        if probe is not None and (probe.width > MAX_IMAGE_WIDTH or probe.height > MAX_IMAGE_HEIGHT):
+            file.close()
+            raise ImageTooLargeError(f"Image too large, must be at most {MAX_IMAGE_WIDTH}x{MAX_IMAGE_HEIGHT}")
+
+    @classmethod
+    def from_file(cls, file):
+        """
+        Wraps an uploaded or stored file, without copying its data.
+
+        The file name is kept when it has an extension, otherwise a unique one is generated.
+
+        Args:
+            file (File): The image file.
+
+        Raises:
+            ImageTooLargeError: If the image is larger than `MAX_IMAGE_SIZE`.
+
+        Returns:
+            DecodedImage: The decoded image.
+        """
+        size = getattr(file, "size", None)
+        if size is None:
+            size = file.seek(0, os.SEEK_END)
+        if size > MAX_IMAGE_SIZE:
+            raise ImageTooLargeError()
+        name = os.path.basename(getattr(file, "name", None) or "")
+        return cls(file, size, name=name if os.path.splitext(name)[1] else None)
+
+    def to_file(self):
+        """
+        Wraps the decoded image in a file that can be assigned to an ImageField.
+
+        Returns:
+            File: The image file.
+        """
+        self.file.seek(0)
+        return File(self.file, name=self.name)
+
+    def verify(self):
+        """
+        Fully parses the image to detect truncated or corrupted data.
+
+        Raises:
+            ValueError: If the image data is corrupted.
+        """
+        self.file.seek(0)
+        try:
+            with Image.open(self.file) as image:
+                image.verify()
+        except Exception as e:
+            raise ValueError(f"corrupted image data, {e}")
+
+    @staticmethod
+    def _inspect(file):
+        """
+        Probes the image header.
+
+        Only the first `HEADER_SIZE` bytes are read; the whole file is only read for JPEG images whose frame header
+        comes after larger metadata segments.
+
+        Args:
+            file (file object): The image file.
+
+        Returns:
+            tuple: The image format, width and height. (None, 0, 0) if the bytes are not a JPEG, PNG or BMP image.
+        """
+        file.seek(0)
+        header = file.read(HEADER_SIZE)
+        probe = probe_image(header)
+        if probe is None and len(header) == HEADER_SIZE and header[:2] == b"\xff\xd8":
+            file.seek(0)
+            probe = probe_image(file.read())
+        if probe is None:
+            return None, 0, 0
+        return probe
+
+
+def normalize_image(image):
+    """
+    Re-encodes an accepted image to shrink it before it is stored, as configured by
+    `TRANSACTIONS_IMAGE_NORMALIZATION`.
+
+    An image is re-encoded to the configured `FORMAT` and `QUALITY` when its format is one of `FORMATS` (by default
+    the uncompressed BMP and the PNG photos), when it is larger than `MAX_WIDTH` x `MAX_HEIGHT` (it is then downscaled
+    keeping its aspect ratio), or when `STRIP_METADATA` is set and it carries EXIF or other metadata. Re-encoding
+    drops the metadata, after applying the EXIF orientation to the pixels.
+
+    Args:
+        image (DecodedImage): The validated image.
+
+    Returns:
+        DecodedImage: The normalized image, or the same image when normalization is disabled or not needed.
+    """
+    options = settings.TRANSACTIONS_IMAGE_NORMALIZATION
+    if not options["ENABLED"]:
+        return image
+    max_width = options["MAX_WIDTH"] or image.width
+    max_height = options["MAX_HEIGHT"] or image.height
+    oversized = image.width > max_width or image.height > max_height
+    image.file.seek(0)
+    with Image.open(image.file) as source:
+        has_metadata = any(key in source.info for key in ("exif", "icc_profile", "xmp", "comment"))
+        if (
+            image.format not in options["FORMATS"]
+            and not oversized
+            and not (options["STRIP_METADATA"] and has_metadata)
+        ):
+            return image
+        normalized = ImageOps.exif_transpose(source)
+        if oversized:
+            normalized.thumbnail((max_width, max_height), Image.LANCZOS)
+        output_format = options["FORMAT"].lower()
+        if output_format == "jpeg" and normalized.mode not in ("RGB", "L"):
+            normalized = normalized.convert("RGB")
+        file = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        normalized.save(file, format=output_format, quality=options["QUALITY"], optimize=True)
+    extension = "jpg" if output_format == "jpeg" else output_format
+    name = f"{os.path.splitext(image.name)[0]}.{extension}"
+    return DecodedImage(file, file.tell(), name=name)
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.transactions.models import PackedFile, Transaction
+from apps.transactions.storage import PackFileStorage
+
+
+class Command(BaseCommand):
+    """
+    Reclaims the space of the pack segments taken by images no longer referenced by a live transaction.
+
+    The images of deleted and soft deleted transactions are dropped from the pack index, then the segments holding
+    dropped images are rewritten with `PackFileStorage.compact`.
+
+    The other processes serving the images keep their maps of the removed segments until their first read once
+    `PackFileStorage.map_check_interval` seconds passed, the reclaimed disk space is only freed then.
+    """
+
+    help = "Compacts the pack segments of PackFileStorage, dropping the images of deleted transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            default=3600,
+            help="Seconds during which a newly packed image is kept even if no transaction references it yet",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, PackFileStorage):
+            raise CommandError("DEFAULT_FILE_STORAGE is not apps.transactions.storage.PackFileStorage")
+
+        dropped, _ = (
+            PackedFile.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=options["grace_period"]))
+            .exclude(name__in=Transaction.objects.filter(frontside_image__isnull=False).values("frontside_image"))
+            .exclude(name__in=Transaction.objects.filter(backside_image__isnull=False).values("backside_image"))
+            .delete()
+        )
+        stats = default_storage.compact()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dropped {dropped} images, rewrote {stats['segments']} segments moving {stats['files']} images, "
+                f"reclaimed {stats['reclaimed']} bytes"
+            )
+        )
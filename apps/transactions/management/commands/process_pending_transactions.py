@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.transactions.workers import process_pending
+
+
+class Command(BaseCommand):
+    """
+    Validates the transactions accepted in asynchronous mode that are still pending.
+
+    Intended to be run after a restart, or periodically, so no accepted transaction is left unprocessed.
+    """
+
+    help = "Validates the pending transactions accepted by the asynchronous validation mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=None,
+            help="Seconds after which a transaction still processing is considered abandoned and queued again",
+        )
+
+    def handle(self, *args, **options):
+        processed = process_pending(stale_after=options["stale_after"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} pending transactions"))
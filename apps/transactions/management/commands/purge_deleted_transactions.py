@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.transactions.models import Transaction
+
+PURGE_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Removes from the database the transactions soft deleted for longer than a retention period.
+
+    Soft deleted transactions keep their images. Removing the rows sends `post_delete`, whose receiver releases the
+    `ImageBlob` references of `ContentAddressedStorage` (removing the blobs no other transaction uses) and the pack
+    index entries of `PackFileStorage`.
+    """
+
+    help = "Removes the transactions soft deleted for longer than the retention period, releasing their images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=30,
+            help="Days a soft deleted transaction is kept before being removed",
+        )
+
+    def handle(self, *args, **options):
+        expired = Transaction.objects_with_deleted.filter(
+            deleted_at__lt=timezone.now() - timedelta(days=options["older_than"])
+        ).order_by("id")
+        purged = 0
+        while True:
+            ids = list(expired.values_list("id", flat=True)[:PURGE_BATCH_SIZE])
+            if not ids:
+                break
+            with transaction.atomic():
+                deleted, _ = Transaction.objects_with_deleted.filter(id__in=ids).delete()
+            purged += deleted
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} soft deleted transactions"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.transactions.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the validation statistics rollup from the transactions table.
+
+    Intended for the first deployment of the rollup, or to repair it; it aggregates the whole table, so it should be
+    run when the validate endpoints are idle.
+    """
+
+    help = "Rebuilds the per client and day validation statistics from the transactions"
+
+    def handle(self, *args, **options):
+        created = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} validation statistics rows"))
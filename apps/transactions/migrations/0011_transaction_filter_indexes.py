@@ -0,0 +1,26 @@
+# Generated by Django 4.1.7 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0010_transaction_created_id_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["client", "created_at", "id"], name="transactions_client_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["result", "error_code", "created_at", "id"],
+                name="transactions_result_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.1.7 on 2026-10-16 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0011_transaction_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transactions_created_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transactions_client_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transactions_result_idx",
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["created_at", "id"],
+                name="transactions_created_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["client", "created_at", "id"],
+                name="transactions_client_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["result", "error_code", "created_at", "id"],
+                name="transactions_result_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["status", "id"],
+                name="transactions_status_idx",
+            ),
+        ),
+    ]
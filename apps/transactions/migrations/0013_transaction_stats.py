@@ -0,0 +1,82 @@
+# Generated by Django 4.1.7 on 2026-10-16 22:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_client_live_indexes"),
+        ("transactions", "0012_transaction_live_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("result", models.BooleanField()),
+                (
+                    "error_code",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        choices=[
+                            (1, "Invalid Frontside Image"),
+                            (2, "Invalid Backside Image"),
+                            (3, "Invalid Frontside And Backside Images"),
+                            (4, "Invalid Client"),
+                            (5, "Invalid Frontside Image And Client"),
+                            (6, "Invalid Backside Image And Client"),
+                            (7, "Invalid Frontside And Backside Images And Client"),
+                        ],
+                        null=True,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "client",
+                    models.ForeignKey(
+                        blank=True,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="users.client",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "transaction_stats",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="transactionstat",
+            index=models.Index(
+                fields=["client", "day"], name="transaction_stats_client_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transactionstat",
+            index=models.Index(fields=["day"], name="transaction_stats_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="transactionstat",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.comparison.Coalesce("client", 0),
+                models.F("day"),
+                models.F("result"),
+                django.db.models.functions.comparison.Coalesce("error_code", 0),
+                name="transaction_stats_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.7 on 2026-10-16 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0013_transaction_stats"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transaction",
+            name="error_code",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                choices=[
+                    (1, "Invalid Frontside Image"),
+                    (2, "Invalid Backside Image"),
+                    (3, "Invalid Frontside And Backside Images"),
+                    (4, "Invalid Client"),
+                    (5, "Invalid Frontside Image And Client"),
+                    (6, "Invalid Backside Image And Client"),
+                    (7, "Invalid Frontside And Backside Images And Client"),
+                    (8, "Processing Error"),
+                ],
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="transactionstat",
+            name="error_code",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                choices=[
+                    (1, "Invalid Frontside Image"),
+                    (2, "Invalid Backside Image"),
+                    (3, "Invalid Frontside And Backside Images"),
+                    (4, "Invalid Client"),
+                    (5, "Invalid Frontside Image And Client"),
+                    (6, "Invalid Backside Image And Client"),
+                    (7, "Invalid Frontside And Backside Images And Client"),
+                    (8, "Processing Error"),
+                ],
+                null=True,
+            ),
+        ),
+    ]
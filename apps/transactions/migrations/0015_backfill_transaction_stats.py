@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+BATCH_SIZE = 1000
+
+
+def backfill_transaction_stats(apps, schema_editor):
+    """
+    Rebuilds the validation statistics from the live completed transactions that existed before the rollup, the same
+    way as `apps.transactions.stats.rebuild_stats` with the historical models.
+    """
+    Transaction = apps.get_model("transactions", "Transaction")
+    TransactionStat = apps.get_model("transactions", "TransactionStat")
+    groups = (
+        Transaction.objects.filter(deleted_at=None, status="completed")
+        .annotate(day=TruncDate("created_at"))
+        .values("client_id", "day", "result", "error_code")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    TransactionStat.objects.all().delete()
+    batch = []
+    for group in groups.iterator(chunk_size=BATCH_SIZE):
+        batch.append(TransactionStat(**group))
+        if len(batch) >= BATCH_SIZE:
+            TransactionStat.objects.bulk_create(batch)
+            batch = []
+    TransactionStat.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0014_processing_error_code"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_transaction_stats, migrations.RunPython.noop),
+    ]
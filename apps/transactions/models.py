@@ -1,7 +1,8 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 
 from apps.users.models import Client
-from apps.utils.models import BaseModel
+from apps.utils.models import BaseModel, live_index
 
 
 class ErrorCodeChoices(models.IntegerChoices):
@@ -16,6 +17,7 @@ class ErrorCodeChoices(models.IntegerChoices):
     - 5: Invalid frontside image and client.
     - 6: Invalid backside image and client.
     - 7: Invalid frontside and backside images and client.
+    - 8: Processing error, the asynchronous validation failed with an unexpected error.
     """
 
     INVALID_FRONTSIDE_IMAGE = 1
@@ -25,6 +27,22 @@ class ErrorCodeChoices(models.IntegerChoices):
     INVALID_FRONTSIDE_IMAGE_AND_CLIENT = 5
     INVALID_BACKSIDE_IMAGE_AND_CLIENT = 6
     INVALID_FRONTSIDE_AND_BACKSIDE_IMAGES_AND_CLIENT = 7
+    PROCESSING_ERROR = 8
+
+
+class TransactionStatusChoices(models.TextChoices):
+    """
+    Represents the processing status of a transaction.
+
+    The statuses are:
+    - pending: The transaction was accepted and waits for its images to be validated.
+    - processing: A worker is validating the transaction images.
+    - completed: The transaction was validated and its result is final.
+    """
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
 
 
 class Transaction(BaseModel):
@@ -33,7 +51,7 @@ class Transaction(BaseModel):
 
     Inherits common fields and methods from the `BaseModel` class such as `created_at`, `updated_at`, `deleted_at`,
     and `is_active`.Defines additional fields specific to a transaction, such as the client, frontside and backside
-    images, result, error code, and details.
+    images, result, error code, details and processing status.
     """
 
     client = models.ForeignKey(Client, on_delete=models.CASCADE, null=True, blank=True, related_name="transactions")
@@ -42,9 +60,18 @@ class Transaction(BaseModel):
     result = models.BooleanField(default=False)
     error_code = models.PositiveSmallIntegerField(blank=True, null=True, choices=ErrorCodeChoices.choices)
     details = models.CharField(blank=True, null=True, max_length=500)
+    status = models.CharField(
+        max_length=20, choices=TransactionStatusChoices.choices, default=TransactionStatusChoices.COMPLETED
+    )
 
     class Meta:
         db_table = "transactions"
+        indexes = [
+            live_index("created_at", "id", name="transactions_created_id_idx"),
+            live_index("client", "created_at", "id", name="transactions_client_idx"),
+            live_index("result", "error_code", "created_at", "id", name="transactions_result_idx"),
+            live_index("status", "id", name="transactions_status_idx"),
+        ]
 
     def __str__(self):
         """
@@ -53,3 +80,100 @@ class Transaction(BaseModel):
         Format: "{client} - status: {result}"
         """
         return f"{self.client} - status: {self.result}"
+
+    def delete(self, *args, **kwargs):
+        """
+        Soft deletes the transaction and removes it from the validation statistics.
+        """
+        from apps.transactions.stats import record_transactions
+
+        counted = self.deleted_at is None and self.status == TransactionStatusChoices.COMPLETED
+        super().delete(*args, **kwargs)
+        if counted:
+            record_transactions([self], delta=-1)
+
+
+class ImageBlob(models.Model):
+    """
+    Represents an image stored once by `ContentAddressedStorage`, keyed by the SHA-256 of its content.
+
+    Keeps how many stored file references point to the blob, so the file is only removed when the last one is
+    released.
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=500)
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "image_blobs"
+
+    def __str__(self):
+        """
+        Returns a string representation of the blob.
+
+        Format: "{name} - references: {references}"
+        """
+        return f"{self.name} - references: {self.references}"
+
+
+class PackedFile(models.Model):
+    """
+    Represents a file appended to a segment of `PackFileStorage`.
+
+    The index row gives the segment number and the byte range of the file inside the segment.
+    """
+
+    name = models.CharField(max_length=500, unique=True)
+    segment = models.PositiveIntegerField()
+    offset = models.PositiveBigIntegerField()
+    length = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "packed_files"
+
+    def __str__(self):
+        """
+        Returns a string representation of the packed file.
+
+        Format: "{name} - segment: {segment}"
+        """
+        return f"{self.name} - segment: {self.segment}"
+
+
+class TransactionStat(models.Model):
+    """
+    Represents the number of completed transactions of a client, day, result and error code.
+
+    The rollup is maintained incrementally by `apps.transactions.stats.record_transactions` and can be rebuilt from
+    the transactions with the `rebuild_transaction_stats` command. Transactions without a client and successful
+    transactions, without an error code, have a null `client` and `error_code`.
+    """
+
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
+    day = models.DateField()
+    result = models.BooleanField()
+    error_code = models.PositiveSmallIntegerField(blank=True, null=True, choices=ErrorCodeChoices.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "transaction_stats"
+        constraints = [
+            models.UniqueConstraint(
+                Coalesce("client", 0), "day", "result", Coalesce("error_code", 0), name="transaction_stats_unique"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["client", "day"], name="transaction_stats_client_idx"),
+            models.Index(fields=["day"], name="transaction_stats_day_idx"),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of the statistic.
+
+        Format: "{client_id} - {day}: {count}"
+        """
+        return f"{self.client_id} - {self.day}: {self.count}"
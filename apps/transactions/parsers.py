@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.files.uploadhandler import StopFutureHandlers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, DataAndFiles
+
+from apps.transactions.images import MAX_IMAGE_SIZE
+
+
+class ValidateOctetStreamParser(BaseParser):
+    """
+    Parser for raw `application/octet-stream` validate requests.
+
+    The body is the frontside image bytes immediately followed by the backside image bytes, without any encoding. The
+    `X-Frontside-Length` header gives the length of the frontside image and the client id is read from the `client`
+    query parameter.
+
+    Both parts are streamed through the request upload handlers, as Django does for multipart uploads, so they are
+    kept in memory or spooled to a temporary file depending on `FILE_UPLOAD_MAX_MEMORY_SIZE`.
+    """
+
+    media_type = "application/octet-stream"
+    errors = {
+        "frontside_length": "Missing or invalid X-Frontside-Length header.",
+        "content_length": "Missing or invalid Content-Length header.",
+        "too_large": f"Image too large, must be at most {MAX_IMAGE_SIZE // (1024 * 1024)}MB",
+        "unhandled": "Validate parse error - none of upload handlers can handle the stream",
+    }
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Splits the request body into the frontside and backside image files.
+
+        Returns:
+            DataAndFiles: The `client` data and the `frontside_image` and `backside_image` files.
+        """
+        parser_context = parser_context or {}
+        request = parser_context["request"]
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        meta = request.META
+        try:
+            content_length = int(meta.get("HTTP_CONTENT_LENGTH", meta.get("CONTENT_LENGTH", 0)))
+        except (ValueError, TypeError):
+            raise ParseError(self.errors["content_length"])
+        try:
+            frontside_length = int(meta["HTTP_X_FRONTSIDE_LENGTH"])
+        except (KeyError, ValueError, TypeError):
+            raise ParseError(self.errors["frontside_length"])
+        backside_length = content_length - frontside_length
+        if frontside_length < 0 or backside_length < 0:
+            raise ParseError(self.errors["frontside_length"])
+        if frontside_length > MAX_IMAGE_SIZE or backside_length > MAX_IMAGE_SIZE:
+            raise ParseError(self.errors["too_large"])
+
+        files = {
+            field_name: self.receive_file(stream, field_name, length, request.upload_handlers, meta, encoding)
+            for field_name, length in (("frontside_image", frontside_length), ("backside_image", backside_length))
+        }
+        return DataAndFiles({"client": request.query_params.get("client")}, files)
+
+    def receive_file(self, stream, field_name, length, upload_handlers, meta, encoding):
+        """
+        Streams the next `length` bytes of the body through the upload handlers.
+
+        The file is named after its field; `DecodedImage` gives it a unique name with the detected extension.
+
+        Note that this code follows DRF's `FileUploadParser`, which is extracted from Django's handling of file
+        uploads in `MultiPartParser`.
+
+        Returns:
+            UploadedFile: The uploaded file.
+        """
+        content_type = self.media_type
+        for handler in upload_handlers:
+            handler.handle_raw_input(stream, meta, length, None, encoding)
+
+        possible_sizes = [handler.chunk_size for handler in upload_handlers if handler.chunk_size]
+        chunk_size = min([2**31 - 4] + possible_sizes)
+        counters = [0] * len(upload_handlers)
+        for index, handler in enumerate(upload_handlers):
+            try:
+                handler.new_file(field_name, field_name, content_type, length, encoding)
+            except StopFutureHandlers:
+                upload_handlers = upload_handlers[: index + 1]
+                break
+
+        remaining = length
+        while remaining > 0:
+            chunk = stream.read(min(chunk_size, remaining))
+            if not chunk:
+                raise ParseError(self.errors["content_length"])
+            remaining -= len(chunk)
+            for index, handler in enumerate(upload_handlers):
+                chunk_length = len(chunk)
+                chunk = handler.receive_data_chunk(chunk, counters[index])
+                counters[index] += chunk_length
+                if chunk is None:
+                    break
+
+        for index, handler in enumerate(upload_handlers):
+            file_obj = handler.file_complete(counters[index])
+            if file_obj is not None:
+                return file_obj
+        raise ParseError(self.errors["unhandled"])
@@ -1,9 +1,17 @@
-from drf_extra_fields.fields import HybridImageField
+from django.conf import settings
+from django.db.transaction import atomic
 from rest_framework import serializers
 
-from apps.transactions.models import Transaction
-from apps.transactions.serializers_utils import decode_base64, format_errors, select_error_code, validate_image
-from apps.users.models import Client
+from apps.transactions.cache import validation_cache, validation_cache_key
+from apps.transactions.fields import DecodedImageField
+from apps.transactions.images import DecodedImage, normalize_image
+from apps.transactions.models import Transaction, TransactionStatusChoices
+from apps.transactions.serializers_utils import format_errors, select_error_code, validate_image
+from apps.transactions.stats import record_transactions
+from apps.transactions.verification import verify_image, wait_verification
+from apps.transactions.writers import get_failed_writer
+from apps.users.cache import get_client, get_clients
+from apps.utils.serializers import ValuesSerializer
 
 
 class TransactionReadSerializer(serializers.ModelSerializer):
@@ -36,9 +44,13 @@ class TransactionReadSerializer(serializers.ModelSerializer):
             "created_at",
             "error_code",
             "details",
+            "status",
         )
 
 
+transaction_values = ValuesSerializer(TransactionReadSerializer)
+
+
 class ValidateSerializer(serializers.ModelSerializer):
     """
     A serializer for validating transaction data.
@@ -50,11 +62,56 @@ class ValidateSerializer(serializers.ModelSerializer):
 
     Outputs:
     - An instance of ValidateSerializer that can be used to validate transaction data.
+
+    Every image is decoded once into a `DecodedImage`, kept in `decoded_images`, and shared by the field parsing,
+    the validation and the creation of the successful or failed transaction. The header checks of both images run
+    inline and their full PIL verifications run concurrently on the verification process pool.
     """
 
     client = serializers.CharField()
-    frontside_image = HybridImageField()
-    backside_image = HybridImageField()
+    frontside_image = DecodedImageField()
+    backside_image = DecodedImageField()
+
+    def __init__(self, *args, **kwargs):
+        """
+        ValidateSerializer class constructor
+
+        Inputs:
+        - args: Additional positional arguments.
+        - kwargs: Additional keyword arguments.
+        """
+        super().__init__(*args, **kwargs)
+        self.decoded_images = {}
+        self.verifications = {}
+        self.cache_key = None
+
+    def to_internal_value(self, data):
+        """
+        Validates the data and collects the image verifications started by the field validators.
+
+        Inputs:
+        - data: The transaction data.
+
+        Outputs:
+        - The validated data.
+
+        Raises:
+        - serializers.ValidationError: If any field is invalid or any image is corrupted.
+        """
+        self.verifications = {}
+        try:
+            validated_data = super().to_internal_value(data)
+            errors = {}
+        except serializers.ValidationError as exc:
+            validated_data, errors = None, dict(exc.detail)
+        for field_name, (verification, image) in self.verifications.items():
+            try:
+                wait_verification(verification, image)
+            except ValueError as e:
+                errors[field_name] = {"error_detail": f"Invalid image, {e}"}
+        if errors:
+            raise serializers.ValidationError({name: errors[name] for name in self.fields if name in errors})
+        return validated_data
 
     def validate_client(self, value):
         """
@@ -69,12 +126,31 @@ class ValidateSerializer(serializers.ModelSerializer):
         Raises:
         - serializers.ValidationError: If the client is invalid.
         """
-        try:
-            client = Client.objects.get(id=value)
-        except Client.DoesNotExist:
+        client = self.resolve_client(value)
+        if client is None:
             raise serializers.ValidationError({"error_detail": "Invalid client"})
         return client
 
+    def resolve_client(self, value):
+        """
+        Resolves a client id into a client instance.
+
+        When the serializer context carries a `clients` mapping (as built by `ValidateBatchSerializer`), the client is
+        looked up there, otherwise it is read from the clients cache.
+
+        Inputs:
+        - value: The client id received in the request.
+
+        Outputs:
+        - The client instance, or None if it does not exist.
+        """
+        if not str(value).isdigit():
+            return None
+        clients = self.context.get("clients")
+        if clients is not None:
+            return clients.get(int(value))
+        return get_client(int(value))
+
     def validate_frontside_image(self, value):
         """
         Validates the frontside image.
@@ -85,7 +161,9 @@ class ValidateSerializer(serializers.ModelSerializer):
         Outputs:
         - The validated frontside image value.
         """
-        return validate_image(value)
+        image = validate_image(value, verify=False)
+        self.verifications["frontside_image"] = (verify_image(image), image)
+        return image
 
     def validate_backside_image(self, value):
         """
@@ -97,11 +175,16 @@ class ValidateSerializer(serializers.ModelSerializer):
         Outputs:
         - The validated backside image value.
         """
-        return validate_image(value)
+        image = validate_image(value, verify=False)
+        self.verifications["backside_image"] = (verify_image(image), image)
+        return image
 
     def create(self, validated_data):
         """
-        Creates a transaction.
+        Creates a transaction and adds it to the validation statistics.
+
+        The images are stored in the database transaction of the insert, so their storage references are rolled back
+        if it fails.
 
         Inputs:
         - validated_data: The validated transaction data.
@@ -109,35 +192,153 @@ class ValidateSerializer(serializers.ModelSerializer):
         Outputs:
         - The created transaction instance.
         """
+        transaction = self.build(validated_data)
+        with atomic():
+            transaction.save()
+            record_transactions([transaction])
+        return transaction
+
+    def build(self, validated_data):
+        """
+        Builds an unsaved successful transaction.
+
+        The accepted images go through `normalize_image` before they are assigned, so they are stored normalized.
+
+        Inputs:
+        - validated_data: The validated transaction data.
+
+        Outputs:
+        - The unsaved transaction instance.
+        """
         validated_data["result"] = True
-        return Transaction.objects.create(**validated_data)
+        validated_data["frontside_image"] = normalize_image(validated_data["frontside_image"]).to_file()
+        validated_data["backside_image"] = normalize_image(validated_data["backside_image"]).to_file()
+        return Transaction(**validated_data)
 
     def failed(self, details, data):
         """
         Fails a transaction.
 
+        When `TRANSACTIONS_FAILED_WRITER` is enabled the transaction is handed to the write-behind
+        `FailedTransactionWriter` and inserted in a later batch, instead of being saved before the response.
+
         Inputs:
         - details: The details of the failed transaction.
         - data: The transaction data.
 
         Outputs:
-        - The created failed transaction instance.
+        - The failed transaction instance, unsaved when it was handed to the writer.
         """
-        client = Client.objects.filter(id=data["client"]).first()
+        transaction = self.build_failed(details, data)
+        if settings.TRANSACTIONS_FAILED_WRITER["ENABLED"]:
+            get_failed_writer().submit(transaction)
+        else:
+            with atomic():
+                transaction.save()
+                record_transactions([transaction])
+        return transaction
+
+    def build_failed(self, details, data):
+        """
+        Builds an unsaved failed transaction.
+
+        Inputs:
+        - details: The details of the failed transaction.
+        - data: The transaction data.
+
+        Outputs:
+        - The unsaved failed transaction instance.
+        """
+        client = self.resolve_client(data.get("client"))
         format_detail = format_errors(error_dict=details)
-        if isinstance(data["frontside_image"], str):
-            data["frontside_image"] = decode_base64(data["frontside_image"])
-        if isinstance(data["backside_image"], str):
-            data["backside_image"] = decode_base64(data["backside_image"])
+        frontside_image = self.get_decoded_image("frontside_image", data)
+        backside_image = self.get_decoded_image("backside_image", data)
         invalidated_data = {
             "client_id": client.id if client else None,
-            "frontside_image": data["frontside_image"],
-            "backside_image": data["backside_image"],
+            "frontside_image": frontside_image.to_file() if frontside_image else None,
+            "backside_image": backside_image.to_file() if backside_image else None,
             "result": False,
             "error_code": select_error_code(details),
             "details": format_detail,
         }
-        return Transaction.objects.create(**invalidated_data)
+        return Transaction(**invalidated_data)
+
+    def get_decoded_image(self, field_name, data):
+        """
+        Returns the decoded image of a field.
+
+        The image decoded while parsing the field is reused; the raw data is only decoded when the field was never
+        parsed.
+
+        Inputs:
+        - field_name: The image field name.
+        - data: The transaction data.
+
+        Outputs:
+        - The decoded image, or None if it was not received or cannot be decoded.
+        """
+        image = self.decoded_images.get(field_name)
+        if image is None and data.get(field_name):
+            try:
+                image = DecodedImage.from_data(data[field_name])
+            except ValueError:
+                return None
+            self.decoded_images[field_name] = image
+        return image
+
+    def get_cached_result(self):
+        """
+        Returns the result of a previous validation of the same client and images.
+
+        The lookup only hashes the received payloads, so a hit is answered without decoding any image.
+
+        Outputs:
+        - A dict with the response `data` and `status` of the previous validation, or None on a miss or when
+          `TRANSACTIONS_VALIDATION_CACHE_ENABLED` is off.
+        """
+        if not settings.TRANSACTIONS_VALIDATION_CACHE_ENABLED:
+            return None
+        self.cache_key = validation_cache_key(self.initial_data)
+        if self.cache_key is None:
+            return None
+        return validation_cache.get(self.cache_key)
+
+    def cache_result(self, data, status_code):
+        """
+        Caches the result of the validation for the key computed by `get_cached_result`.
+
+        Inputs:
+        - data: The response data, the serialized transaction or the validation errors.
+        - status_code: The response status code.
+        """
+        if self.cache_key is not None:
+            validation_cache.set(self.cache_key, {"data": data, "status": status_code})
+
+    def accept(self, data):
+        """
+        Accepts a transaction to be validated asynchronously.
+
+        The client is resolved and the images are stored as received, the transaction is persisted as pending and
+        its validation is left to `apps.transactions.workers`.
+
+        Inputs:
+        - data: The transaction data.
+
+        Outputs:
+        - The created pending transaction instance, or None if the images could not be decoded.
+        """
+        frontside_image = self.get_decoded_image("frontside_image", data)
+        backside_image = self.get_decoded_image("backside_image", data)
+        if frontside_image is None or backside_image is None:
+            return None
+        client = self.resolve_client(data.get("client"))
+        with atomic():
+            return Transaction.objects.create(
+                client=client,
+                frontside_image=frontside_image.to_file(),
+                backside_image=backside_image.to_file(),
+                status=TransactionStatusChoices.PENDING,
+            )
 
     class Meta:
         model = Transaction
@@ -150,3 +351,69 @@ class ValidateSerializer(serializers.ModelSerializer):
             "error_code",
             "details",
         )
+
+
+class ValidateBatchSerializer(serializers.Serializer):
+    """
+    A serializer for validating many transactions in a single request.
+
+    Every item is validated with `ValidateSerializer`. All the client ids are resolved at once from the clients cache,
+    with a single query for the ones not cached, and every transaction, successful or failed, is persisted with a
+    single `bulk_create`.
+
+    Inputs:
+    - items: A list of objects with the `client`, `frontside_image` and `backside_image` fields.
+
+    Outputs:
+    - An instance of ValidateBatchSerializer that can be used to validate a batch of transactions.
+    """
+
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.TRANSACTIONS_VALIDATE_BATCH_MAX_SIZE,
+    )
+
+    def create(self, validated_data):
+        """
+        Validates every item and creates its transaction.
+
+        Inputs:
+        - validated_data: The validated batch data.
+
+        Outputs:
+        - A list with a `(transaction, errors)` tuple per item, in input order. `errors` is None for successful items.
+        """
+        items = validated_data["items"]
+        client_ids = {int(item["client"]) for item in items if str(item.get("client", "")).isdigit()}
+        context = {**self.context, "clients": get_clients(client_ids)}
+        results = []
+        for item in items:
+            serializer = ValidateSerializer(data=item, context=context)
+            if serializer.is_valid():
+                results.append((serializer.build(serializer.validated_data), None))
+            else:
+                results.append((serializer.build_failed(details=serializer.errors, data=item), serializer.errors))
+        with atomic():
+            transactions = Transaction.objects.bulk_create([transaction for transaction, _ in results])
+            record_transactions(transactions)
+        return results
+
+    def to_representation(self, instance):
+        """
+        Represents the batch results.
+
+        Inputs:
+        - instance: The list of `(transaction, errors)` tuples returned by `create`.
+
+        Outputs:
+        - A dict whose `results` list has the serialized transaction per item, including the validation errors of the
+          failed ones.
+        """
+        representation = []
+        for transaction, errors in instance:
+            data = ValidateSerializer(transaction, context=self.context).data
+            if errors is not None:
+                data["errors"] = errors
+            representation.append(data)
+        return {"results": representation}
@@ -1,48 +1,48 @@
-import base64
-import imghdr
-
-from django.core.files.base import ContentFile
 from rest_framework import serializers
 
-IMAGE_VALID_FORMATS = ("jpeg", "jpg", "png", "bpm")
+from apps.transactions.images import MAX_IMAGE_HEIGHT, MAX_IMAGE_SIZE, MAX_IMAGE_WIDTH, DecodedImage
+
+IMAGE_VALID_FORMATS = ("jpeg", "jpg", "png", "bmp")
 
 
-def validate_image(image):
+def validate_image(image, verify=True):
     """
     Validates the image.
 
     Args:
-        image (str or PIL.Image.Image): The image to be validated.
+        image (str or DecodedImage): The image to be validated.
+        verify (bool, optional): Whether to run the full PIL verification after the header checks. The serializer
+            disables it to run the verification on the process pool of `apps.transactions.verification`.
 
     Raises:
         serializers.ValidationError: If the image is invalid.
 
     Returns:
-        PIL.Image.Image: The validated image.
+        DecodedImage: The validated image.
     """
     if isinstance(image, str):
         try:
-            image = decode_base64(image)
+            image = DecodedImage.from_base64(image)
         except Exception as e:
             raise serializers.ValidationError({"error_detail": f"Invalid image, {e}"})
-    img_format = imghdr.what(image)
-    if img_format not in IMAGE_VALID_FORMATS:
+    if image.format not in IMAGE_VALID_FORMATS:
         raise serializers.ValidationError({"error_detail": f"Invalid image format, must be {IMAGE_VALID_FORMATS}"})
-    if image.image.width < 224 or image.image.height < 224:
+    if image.width < 224 or image.height < 224:
         raise serializers.ValidationError({"error_detail": "Image too small, must be at least 224x224"})
-    if image.image.width > 3840 or image.image.height > 2160:
-        raise serializers.ValidationError({"error_detail": "Image too large, must be at most 3840x2160"})
-    if image.size > 4 * 1024 * 1024:
+    if image.width > MAX_IMAGE_WIDTH or image.height > MAX_IMAGE_HEIGHT:
+        raise serializers.ValidationError(
+            {"error_detail": f"Image too large, must be at most {MAX_IMAGE_WIDTH}x{MAX_IMAGE_HEIGHT}"}
+        )
+    if image.size > MAX_IMAGE_SIZE:
         raise serializers.ValidationError({"error_detail": "Image too large, must be at most 4MB"})
+    if verify:
+        try:
+            image.verify()
+        except ValueError as e:
+            raise serializers.ValidationError({"error_detail": f"Invalid image, {e}"})
     return image
 
 
-def decode_base64(data):
-    format, imgstr = data.split(';base64,')
-    ext = format.split('/')[-1]
-    return ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
-
-
 def select_error_code(details):
     """
     Selects the error code based on the details.
@@ -83,7 +83,10 @@ def format_errors(error_dict):
     """
     result = ""
     for key, value in error_dict.items():
-        error_detail = value.get('error_detail')
+        if isinstance(value, dict):
+            error_detail = value.get('error_detail')
+        else:
+            error_detail = " ".join(str(error) for error in value)
         if error_detail:
             result += f"{key}: {error_detail.__str__()}, "
     return result.rstrip(', ')
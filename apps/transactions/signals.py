@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.transactions.models import Transaction
+from apps.transactions.stats import unrecord_transactions
+from apps.transactions.storage import ContentAddressedStorage, PackFileStorage
+from apps.utils.models import post_soft_delete
+
+
+@receiver(post_delete, sender=Transaction)
+def release_transaction_images(sender, instance, **kwargs):
+    """
+    Releases the image blob references, or pack index entries, of a transaction removed from the database.
+
+    Soft deleted transactions keep their images, only rows that are really deleted release them.
+    """
+    for field_file in (instance.frontside_image, instance.backside_image):
+        if field_file and isinstance(field_file.storage, (ContentAddressedStorage, PackFileStorage)):
+            field_file.storage.delete(field_file.name)
+
+
+@receiver(post_soft_delete, sender=Transaction)
+def unrecord_soft_deleted_transactions(sender, pks, **kwargs):
+    """
+    Removes the transactions soft deleted by `SoftDeleteQuerySet.soft_delete` from the validation statistics.
+    """
+    unrecord_transactions(Transaction.objects_with_deleted.filter(pk__in=pks))
@@ -0,0 +1,155 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.transactions.models import Transaction, TransactionStat, TransactionStatusChoices
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def record_transactions(transactions, delta=1):
+    """
+    Adds completed transactions to the validation statistics, or removes them with a negative `delta`.
+
+    The transactions are grouped by client, day, result and error code, and every group increments its rollup row
+    with a single UPDATE, creating the row on its first transaction.
+
+    Args:
+        transactions (iterable): The saved transactions.
+        delta (int, optional): 1 for created transactions, -1 for deleted ones.
+    """
+    groups = Counter(
+        (instance.client_id, timezone.localdate(instance.created_at), instance.result, instance.error_code)
+        for instance in transactions
+        if instance.status == TransactionStatusChoices.COMPLETED
+    )
+    with transaction.atomic():
+        for (client_id, day, result, error_code), count in sorted(groups.items(), key=str):
+            increment(client_id, day, result, error_code, count * delta)
+
+
+def increment(client_id, day, result, error_code, delta):
+    """
+    Increments the count of a rollup row, creating the row when it does not exist yet.
+
+    The row is created in a savepoint, so when a concurrent request created it first the increment is retried as an
+    UPDATE.
+    """
+    rows = TransactionStat.objects.filter(client_id=client_id, day=day, result=result, error_code=error_code)
+    if rows.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            TransactionStat.objects.create(
+                client_id=client_id, day=day, result=result, error_code=error_code, count=delta
+            )
+    except IntegrityError:
+        rows.update(count=F("count") + delta)
+
+
+def group_completed(queryset):
+    """
+    Groups the completed transactions of a queryset by client, day, result and error code, in the database.
+
+    Args:
+        queryset (QuerySet): The transactions.
+
+    Returns:
+        QuerySet: A dict per group, with the `client_id`, `day`, `result`, `error_code` and `count` keys.
+    """
+    return (
+        queryset.filter(status=TransactionStatusChoices.COMPLETED)
+        .annotate(day=TruncDate("created_at"))
+        .values("client_id", "day", "result", "error_code")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+
+
+def unrecord_transactions(queryset):
+    """
+    Removes the completed transactions of a queryset from the validation statistics, grouping them in the database
+    so the transactions are never loaded.
+
+    Args:
+        queryset (QuerySet): The transactions, soft deleted in bulk.
+    """
+    with transaction.atomic():
+        for group in sorted(group_completed(queryset), key=str):
+            increment(group["client_id"], group["day"], group["result"], group["error_code"], -group["count"])
+
+
+def rebuild_stats():
+    """
+    Rebuilds the whole rollup from the live completed transactions.
+
+    Returns:
+        int: The number of rollup rows.
+    """
+    groups = group_completed(Transaction.objects.all())
+    created = 0
+    with transaction.atomic():
+        TransactionStat.objects.all().delete()
+        batch = []
+        for group in groups.iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch.append(TransactionStat(**group))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                created += len(TransactionStat.objects.bulk_create(batch))
+                batch = []
+        created += len(TransactionStat.objects.bulk_create(batch))
+    return created
+
+
+def summarize_stats(queryset):
+    """
+    Groups rollup rows by client and day.
+
+    Args:
+        queryset (QuerySet): The rollup rows.
+
+    Returns:
+        list: A dict per client and day with the `succeeded` and `failed` counts and the `error_codes` histogram.
+    """
+    summaries = {}
+    rows = queryset.order_by("client_id", "day").values_list("client_id", "day", "result", "error_code", "count")
+    for client_id, day, result, error_code, count in rows:
+        summary = summaries.setdefault(
+            (client_id, day),
+            {"client": client_id, "day": day.isoformat(), "succeeded": 0, "failed": 0, "error_codes": {}},
+        )
+        if result:
+            summary["succeeded"] += count
+        else:
+            summary["failed"] += count
+            if error_code is not None:
+                summary["error_codes"][str(error_code)] = summary["error_codes"].get(str(error_code), 0) + count
+    return list(summaries.values())
+
+
+def annotate_client_activity(queryset):
+    """
+    Annotates clients with their number of transactions, of failed transactions and their last transaction time.
+
+    Each annotation is a correlated subquery on the live transactions of the client, served by the
+    (`client`, `created_at`, `id`) index, so listing a page of clients with their activity is a single query.
+
+    Args:
+        queryset (QuerySet): The clients queryset.
+
+    Returns:
+        QuerySet: The queryset with the `transactions_count`, `failed_transactions_count` and `last_transaction_at`
+        annotations.
+    """
+    transactions = Transaction.objects.filter(client=OuterRef("pk")).order_by()
+
+    def count(transactions):
+        return Coalesce(Subquery(transactions.values("client").annotate(count=Count("id")).values("count")), 0)
+
+    return queryset.annotate(
+        transactions_count=count(transactions),
+        failed_transactions_count=count(transactions.filter(result=False)),
+        last_transaction_at=Subquery(transactions.order_by("-created_at", "-id").values("created_at")[:1]),
+    )
@@ -0,0 +1,352 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+from django.utils.functional import cached_property
+
+from apps.utils.files import MemoryViewReader
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that keeps every file under the SHA-256 of its content.
+
+    Identical files are written once and every saved name points to the same blob, so retries and resubmissions of
+    the same image don't create new files. The number of references of each blob is kept in `ImageBlob`: every
+    `save` adds one and every `delete` releases one, and the file is only removed with the last reference.
+
+    The blob row is locked while its file is written or removed, so a `save` racing with the `delete` of the last
+    reference either finds the row and keeps the file, or creates it again and rewrites the file. The reference is
+    added in the database transaction of the caller, if any, so it is rolled back with the insert of the row that
+    holds it; save the file and insert the row in the same transaction.
+
+    Soft deleted transactions keep their references, so their blobs are only released once the rows are removed by
+    the `purge_deleted_transactions` command.
+
+    Files are stored as `{directory}/{digest[:2]}/{digest}{extension}`, ignoring the `upload_to` directory of the
+    field so the frontside and backside images share their blobs too.
+
+    Enable it with `DEFAULT_FILE_STORAGE = "apps.transactions.storage.ContentAddressedStorage"`.
+    """
+
+    directory = "images/blobs"
+
+    def save(self, name, content, max_length=None):
+        """
+        Saves the content under its digest, writing it only if no blob with the same content exists, and adds a
+        reference to the blob.
+
+        Args:
+            name (str): The name requested by the field, only its extension is kept.
+            content (File): The file content.
+            max_length (int, optional): Not used, digest names have a fixed length.
+
+        Returns:
+            str: The name of the blob.
+        """
+        from apps.transactions.models import ImageBlob
+
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = self.digest(content)
+        extension = os.path.splitext(name)[1].lower()
+        name = f"{self.directory}/{digest[:2]}/{digest}{extension}"
+        with transaction.atomic():
+            blob, created = ImageBlob.objects.select_for_update().get_or_create(digest=digest, defaults={"name": name})
+            if created or not self.exists(blob.name):
+                self._save(blob.name, content)
+            ImageBlob.objects.filter(id=blob.id).update(references=F("references") + 1)
+        return blob.name
+
+    def _save(self, name, content):
+        """
+        Writes the content to a temporary file and moves it to its final name, so concurrent writes of the same blob
+        can never leave a partial file.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temporary_file:
+            for chunk in content.chunks():
+                temporary_file.write(chunk)
+        os.replace(temporary_file.name, full_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+    def delete(self, name):
+        """
+        Releases one reference to the blob and removes its file when it was the last one.
+
+        Args:
+            name (str): The name of the blob.
+        """
+        from apps.transactions.models import ImageBlob
+
+        with transaction.atomic():
+            blob = ImageBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return
+            if blob.references > 1:
+                ImageBlob.objects.filter(id=blob.id).update(references=F("references") - 1)
+                return
+            blob.delete()
+            super().delete(name)
+
+    @staticmethod
+    def digest(content):
+        """
+        Computes the SHA-256 of the file content.
+
+        Args:
+            content (File): The file content.
+
+        Returns:
+            str: The hexadecimal digest.
+        """
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+
+@deconstructible
+class PackFileStorage(Storage):
+    """
+    Storage that appends the files to large segment files instead of creating one file per image.
+
+    Every file is appended to the active segment (`segment-000001.pack`, ...) and its segment, offset and length are
+    indexed in `PackedFile`. A new segment is started once the active one reaches `TRANSACTIONS_PACK_SEGMENT_SIZE`
+    bytes. Appends are serialized among processes with a lock file.
+
+    Files are read through read-only memory maps of the segments, each one mapped once per process: opening a file
+    returns a file object over a slice of the map, without copying it. Every `map_check_interval` seconds, the maps
+    of the segments removed or replaced by `compact` in another process are dropped, so their disk space is freed
+    once the files opened from them are closed.
+
+    Deleting a file only removes it from the index; `compact` rewrites the segments to reclaim the space of the files
+    no longer indexed (see the `compact_image_packs` command).
+
+    Enable it with `DEFAULT_FILE_STORAGE = "apps.transactions.storage.PackFileStorage"`.
+    """
+
+    segment_pattern = re.compile(r"^segment-(\d+)\.pack$")
+    map_check_interval = 60
+
+    def __init__(self, location=None, base_url=None, segment_size=None):
+        """
+        PackFileStorage class constructor
+
+        Args:
+            location (str, optional): The directory of the segments, `MEDIA_ROOT/packs` by default.
+            base_url (str, optional): The URL prefix of the files, `MEDIA_URL` by default.
+            segment_size (int, optional): The size at which a new segment is started.
+        """
+        self._location = location
+        self._base_url = base_url
+        self._segment_size = segment_size
+        self._maps = {}
+        self._maps_checked_at = time.monotonic()
+
+    @cached_property
+    def location(self):
+        return os.path.abspath(self._location or os.path.join(settings.MEDIA_ROOT, "packs"))
+
+    @cached_property
+    def base_url(self):
+        return self._base_url if self._base_url is not None else settings.MEDIA_URL
+
+    @cached_property
+    def segment_size(self):
+        return self._segment_size or settings.TRANSACTIONS_PACK_SEGMENT_SIZE
+
+    def segment_path(self, segment):
+        """
+        Returns the path of a segment file.
+        """
+        return os.path.join(self.location, f"segment-{segment:06d}.pack")
+
+    def segments(self):
+        """
+        Returns the numbers of the existing segments, in order.
+        """
+        if not os.path.isdir(self.location):
+            return []
+        matches = (self.segment_pattern.match(file_name) for file_name in os.listdir(self.location))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    @contextmanager
+    def lock(self):
+        """
+        Holds the exclusive lock of the segments, shared by every process using the same location.
+        """
+        os.makedirs(self.location, exist_ok=True)
+        with open(os.path.join(self.location, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save(self, name, content):
+        """
+        Appends the content to the active segment and indexes it.
+        """
+        from apps.transactions.models import PackedFile
+
+        with self.lock():
+            segments = self.segments()
+            segment = segments[-1] if segments else 1
+            if os.path.exists(self.segment_path(segment)) and os.path.getsize(self.segment_path(segment)) >= (
+                self.segment_size
+            ):
+                segment += 1
+            with open(self.segment_path(segment), "ab") as segment_file:
+                offset = segment_file.seek(0, os.SEEK_END)
+                for chunk in content.chunks():
+                    segment_file.write(chunk)
+                length = segment_file.tell() - offset
+                segment_file.flush()
+                os.fsync(segment_file.fileno())
+            PackedFile.objects.create(name=name, segment=segment, offset=offset, length=length)
+        return name
+
+    def _open(self, name, mode="rb"):
+        """
+        Opens a file as a read-only view of its segment memory map.
+        """
+        from apps.transactions.models import PackedFile
+
+        if "w" in mode or "a" in mode or "+" in mode:
+            raise ValueError("PackFileStorage files are read-only")
+        packed_file = PackedFile.objects.filter(name=name).first()
+        if packed_file is None:
+            raise FileNotFoundError(name)
+        return File(MemoryViewReader(self.view(packed_file)), name=name)
+
+    def view(self, packed_file):
+        """
+        Returns the bytes of a packed file as a slice of the memory map of its segment.
+
+        Segments are mapped once per process, with the inode of the mapped file, and mapped again when they grew past
+        the mapped length.
+
+        Args:
+            packed_file (PackedFile): The index entry of the file.
+
+        Returns:
+            memoryview: The file bytes.
+        """
+        if time.monotonic() - self._maps_checked_at >= self.map_check_interval:
+            self.drop_stale_maps()
+        end = packed_file.offset + packed_file.length
+        mapped, _ = self._maps.get(packed_file.segment, (None, None))
+        if mapped is None or len(mapped) < end:
+            with open(self.segment_path(packed_file.segment), "rb") as segment_file:
+                mapped = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+                inode = os.fstat(segment_file.fileno()).st_ino
+            self._maps[packed_file.segment] = (mapped, inode)
+        return memoryview(mapped)[packed_file.offset : end]
+
+    def drop_stale_maps(self):
+        """
+        Drops the maps of the segments whose file was removed, or replaced by another inode, since they were mapped.
+
+        The maps are not closed, as files opened from them may still be read; they are unmapped once released.
+        """
+        self._maps_checked_at = time.monotonic()
+        for segment, (_, inode) in list(self._maps.items()):
+            try:
+                stale = os.stat(self.segment_path(segment)).st_ino != inode
+            except FileNotFoundError:
+                stale = True
+            if stale:
+                self._maps.pop(segment, None)
+
+    def delete(self, name):
+        """
+        Removes a file from the index, its space is reclaimed by `compact`.
+        """
+        from apps.transactions.models import PackedFile
+
+        PackedFile.objects.filter(name=name).delete()
+
+    def exists(self, name):
+        from apps.transactions.models import PackedFile
+
+        return PackedFile.objects.filter(name=name).exists()
+
+    def size(self, name):
+        from apps.transactions.models import PackedFile
+
+        packed_file = PackedFile.objects.filter(name=name).first()
+        if packed_file is None:
+            raise FileNotFoundError(name)
+        return packed_file.length
+
+    def url(self, name):
+        return urljoin(self.base_url, filepath_to_uri(name))
+
+    def compact(self):
+        """
+        Rewrites the segments holding bytes of files no longer indexed.
+
+        The indexed files of those segments are copied to new segments, the index is updated in a single database
+        transaction and the old segment files are removed.
+
+        Returns:
+            dict: The number of compacted segments, of moved files and of reclaimed bytes.
+        """
+        from apps.transactions.models import PackedFile
+
+        with self.lock():
+            segments = self.segments()
+            indexed = dict(
+                PackedFile.objects.values("segment").annotate(total=Sum("length")).values_list("segment", "total")
+            )
+            sizes = {segment: os.path.getsize(self.segment_path(segment)) for segment in segments}
+            compacted = [segment for segment in segments if indexed.get(segment, 0) < sizes[segment]]
+            if not compacted:
+                return {"segments": 0, "files": 0, "reclaimed": 0}
+
+            target = segments[-1] + 1
+            target_file = open(self.segment_path(target), "ab")
+            moved = []
+            try:
+                entries = PackedFile.objects.filter(segment__in=compacted).order_by("segment", "offset")
+                for packed_file in entries.iterator(chunk_size=1000):
+                    if target_file.tell() >= self.segment_size:
+                        target_file.close()
+                        target += 1
+                        target_file = open(self.segment_path(target), "ab")
+                    offset = target_file.tell()
+                    target_file.write(self.view(packed_file))
+                    packed_file.segment, packed_file.offset = target, offset
+                    moved.append(packed_file)
+                target_file.flush()
+                os.fsync(target_file.fileno())
+            finally:
+                target_file.close()
+
+            with transaction.atomic():
+                PackedFile.objects.bulk_update(moved, ["segment", "offset"], batch_size=1000)
+            for segment in compacted:
+                self._maps.pop(segment, None)
+                os.remove(self.segment_path(segment))
+        reclaimed = sum(sizes[segment] - indexed.get(segment, 0) for segment in compacted)
+        return {"segments": len(compacted), "files": len(moved), "reclaimed": reclaimed}
@@ -1,3 +1,146 @@
-from django.test import TestCase
+import base64
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.transactions.images import BASE64_CHUNK_SIZE, DecodedImage, ImageTooLargeError, decoded_length
+from apps.transactions.models import ImageBlob, Transaction, TransactionStat
+from apps.transactions.stats import record_transactions
+from apps.transactions.storage import ContentAddressedStorage
+from apps.users.models import Client, User
+
+
+def make_image(width, height, noise=False):
+    """
+    Encodes a PNG image, with random pixels when `noise` is set so it does not compress.
+    """
+    if noise:
+        image = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    else:
+        image = Image.new("RGB", (width, height), (10, 20, 30))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def data_uri(data):
+    return "data:image/png;base64," + base64.b64encode(data).decode()
+
+
+class DecodedImageBase64Tests(TestCase):
+    """
+    Tests the chunked base64 decoding of `DecodedImage.from_base64`.
+    """
+
+    def setUp(self):
+        self.data = make_image(500, 500, noise=True)
+        self.assertGreater(len(self.data), BASE64_CHUNK_SIZE)
+
+    def assertDecodes(self, encoded):
+        image = DecodedImage.from_base64(encoded)
+        image.file.seek(0)
+        self.assertEqual(image.file.read(), self.data)
+        self.assertEqual((image.format, image.width, image.height), ("png", 500, 500))
+
+    def test_decodes_unwrapped_base64_in_chunks(self):
+        self.assertDecodes(data_uri(self.data))
+
+    def test_decodes_line_wrapped_base64_in_chunks(self):
+        wrapped = base64.encodebytes(self.data).decode()
+        self.assertDecodes(wrapped)
+        self.assertDecodes("data:image/png;base64," + wrapped.replace("\n", "\r\n"))
+
+    def test_decoded_length_ignores_whitespace(self):
+        wrapped = base64.encodebytes(self.data).decode().replace("\n", "\r\n")
+        self.assertEqual(decoded_length(wrapped), len(self.data))
+        self.assertEqual(decoded_length(data_uri(self.data), len("data:image/png;base64,")), len(self.data))
+
+    def test_rejects_invalid_base64(self):
+        with self.assertRaises(ValueError):
+            DecodedImage.from_base64(data_uri(self.data)[:-3])
+
+    def test_rejects_oversized_dimensions_from_the_first_chunk(self):
+        with self.assertRaisesMessage(ImageTooLargeError, "must be at most 3840x2160"):
+            DecodedImage.from_base64(data_uri(make_image(4000, 2200)))
+
+
+class SoftDeleteStatsTests(TestCase):
+    """
+    Tests that set-based soft deletes remove exactly their own transactions from the validation statistics.
+    """
+
+    def test_soft_deletes_sharing_a_timestamp(self):
+        first = Client.objects.create(first_name="a", last_name="a", email="a@example.com")
+        second = Client.objects.create(first_name="b", last_name="b", email="b@example.com")
+        transactions = [Transaction.objects.create(client=client, result=True) for client in (first, second, second)]
+        record_transactions(transactions)
+        now = timezone.now()
+        with mock.patch("apps.utils.models.timezone.now", return_value=now):
+            Transaction.objects.filter(client=first).soft_delete()
+            Transaction.objects.filter(client=second).soft_delete()
+        counts = dict(TransactionStat.objects.values_list("client_id", "count"))
+        self.assertEqual(counts, {first.id: 0, second.id: 0})
+
+
+@override_settings(TRANSACTIONS_VALIDATION_CACHE_ENABLED=False, TRANSACTIONS_IMAGE_VERIFY_PROCESSES=0)
+class ContentAddressedStorageTests(TestCase):
+    """
+    Tests the blob references of `ContentAddressedStorage` across the purge and resubmission of a transaction.
+    """
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        self.storage = ContentAddressedStorage(location=location)
+        for field_name in ("frontside_image", "backside_image"):
+            patcher = mock.patch.object(Transaction._meta.get_field(field_name), "storage", self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_superuser("admin@example.com", "password"))
+        self.client_instance = Client.objects.create(first_name="a", last_name="b", email="a@example.com")
+        self.payload = {
+            "client": self.client_instance.id,
+            "frontside_image": data_uri(make_image(300, 300)),
+            "backside_image": data_uri(make_image(400, 400)),
+        }
+
+    def validate(self):
+        response = self.api.post("/api/transactions/validate/", self.payload, format="json")
+        self.assertEqual(response.status_code, 201)
+
+    def purge(self):
+        Transaction.objects.all().soft_delete()
+        Transaction.objects_with_deleted.update(deleted_at=timezone.now() - timedelta(days=2))
+        call_command("purge_deleted_transactions", older_than=1, stdout=io.StringIO())
+
+    def test_identical_images_share_their_blobs(self):
+        self.validate()
+        self.validate()
+        self.assertEqual(sorted(ImageBlob.objects.values_list("references", flat=True)), [2, 2])
+
+    def test_purge_and_resubmit(self):
+        self.validate()
+        names = list(ImageBlob.objects.values_list("name", flat=True))
+        self.purge()
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(any(self.storage.exists(name) for name in names))
+        self.validate()
+        self.assertEqual(sorted(ImageBlob.objects.values_list("references", flat=True)), [1, 1])
+        self.assertTrue(all(self.storage.exists(name) for name in ImageBlob.objects.values_list("name", flat=True)))
+
+    def test_failed_insert_rolls_back_the_references(self):
+        self.validate()
+        with mock.patch("apps.transactions.serializers.record_transactions", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.validate()
+        self.assertEqual(sorted(ImageBlob.objects.values_list("references", flat=True)), [1, 1])
@@ -5,5 +5,9 @@ from . import views
 urlpatterns = [
     path('transactions/', views.TransactionsView.as_view()),
     path('transactions/<int:pk>/', views.TransactionsView.as_view()),
+    path('transactions/export/', views.TransactionsExportView.as_view()),
+    path('transactions/stats/', views.TransactionStatsView.as_view()),
     path('transactions/validate/', views.ValidateView.as_view()),
+    path('transactions/validate/batch/', views.ValidateBatchView.as_view()),
+    path('clients/<int:pk>/transactions/', views.ClientTransactionsView.as_view()),
 ]
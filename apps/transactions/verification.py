@@ -0,0 +1,167 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from django.conf import settings
+from PIL import Image
+
+from apps.utils.files import MemoryViewReader
+
+COPY_CHUNK_SIZE = 256 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the process pool shared by every request of the process, creating it on first use.
+
+    The pool uses the spawn start method, so its processes never inherit the database connections of the parent.
+
+    Returns:
+        ProcessPoolExecutor: The pool, or None when `TRANSACTIONS_IMAGE_VERIFY_PROCESSES` is 0.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None and settings.TRANSACTIONS_IMAGE_VERIFY_PROCESSES > 0:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.TRANSACTIONS_IMAGE_VERIFY_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def reset_pool(pool):
+    """
+    Discards a broken process pool, a pool process died, so the next verification creates a new one.
+
+    Args:
+        pool (ProcessPoolExecutor): The broken pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def verify_image(image):
+    """
+    Starts the full PIL verification of a decoded image.
+
+    With a process pool the image bytes are copied once into a shared memory block, which the pool process reads
+    without pickling them, and the block is released when the verification finishes. Without a pool the image is
+    verified inline.
+
+    Args:
+        image (DecodedImage): The image to verify.
+
+    Returns:
+        Future: A future resolved with None, or with the ValueError raised if the image data is corrupted. Wait for it
+        with `wait_verification`.
+    """
+    pool = get_pool()
+    if pool is None:
+        return _verify_inline(image)
+
+    block = shared_memory.SharedMemory(create=True, size=max(image.size, 1))
+    image.file.seek(0)
+    position = 0
+    while position < image.size:
+        chunk = image.file.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            break
+        block.buf[position : position + len(chunk)] = chunk
+        position += len(chunk)
+    try:
+        future = pool.submit(_verify_shared_image, block.name, position)
+    except BrokenProcessPool:
+        _release(block)
+        reset_pool(pool)
+        return _verify_inline(image)
+    except Exception:
+        _release(block)
+        raise
+    future.add_done_callback(lambda _: _release(block))
+    future.add_done_callback(lambda done: _reset_broken_pool(pool, done))
+    return future
+
+
+def wait_verification(future, image):
+    """
+    Waits for the verification of an image started by `verify_image`.
+
+    If the pool process verifying the image died, an out of memory kill or a crash of a PIL decoder, the pool has
+    been discarded by `verify_image` and the image is verified inline instead.
+
+    Args:
+        future (Future): The future returned by `verify_image`.
+        image (DecodedImage): The verified image.
+
+    Raises:
+        ValueError: If the image data is corrupted.
+    """
+    try:
+        future.result()
+    except BrokenProcessPool:
+        image.verify()
+
+
+def _reset_broken_pool(pool, future):
+    """
+    Discards the pool of a verification that failed because a pool process died.
+    """
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        reset_pool(pool)
+
+
+def _verify_inline(image):
+    """
+    Verifies an image in the current thread.
+
+    Returns:
+        Future: A resolved future, like the ones of `verify_image`.
+    """
+    future = Future()
+    try:
+        image.verify()
+    except ValueError as e:
+        future.set_exception(e)
+    else:
+        future.set_result(None)
+    return future
+
+
+def _release(block):
+    """
+    Closes and removes a shared memory block.
+    """
+    block.close()
+    block.unlink()
+
+
+def _verify_shared_image(name, size):
+    """
+    Verifies the image stored in a shared memory block. Runs in a pool process.
+
+    Args:
+        name (str): The shared memory block name.
+        size (int): The image size in bytes.
+
+    Raises:
+        ValueError: If the image data is corrupted.
+    """
+    # The pool processes share the resource tracker of the parent, which unlinks the block once verified.
+    block = shared_memory.SharedMemory(name=name)
+    reader = MemoryViewReader(block.buf[:size])
+    try:
+        with Image.open(reader) as image:
+            image.verify()
+    except Exception as e:
+        raise ValueError(f"corrupted image data, {e}")
+    finally:
+        reader.close()
+        block.close()
@@ -1,18 +1,36 @@
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.generics import DestroyAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import DestroyAPIView, GenericAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.transactions.models import Transaction
-from apps.transactions.serializers import TransactionReadSerializer, ValidateSerializer
+from apps.transactions import workers
+from apps.transactions.exports import EXPORT_FORMATS, export_rows, stream_csv, stream_ndjson
+from apps.transactions.filters import TransactionFilterBackend, TransactionStatsFilterSerializer
+from apps.transactions.models import Transaction, TransactionStat
+from apps.transactions.parsers import ValidateOctetStreamParser
+from apps.transactions.serializers import (
+    TransactionReadSerializer,
+    ValidateBatchSerializer,
+    ValidateSerializer,
+    transaction_values,
+)
+from apps.transactions.stats import summarize_stats
+from apps.users.models import Client
+from apps.utils.pagination import KeysetPagination
+from apps.utils.views import ConditionalGetMixin
 
 
-class TransactionsView(ListAPIView, RetrieveAPIView, DestroyAPIView):
+class TransactionsView(ConditionalGetMixin, ListAPIView, RetrieveAPIView, DestroyAPIView):
     """
     A view for handling HTTP requests related to transactions.
 
-    Inherits from ListAPIView, RetrieveAPIView, and DestroyAPIView.
+    Inherits from ListAPIView, RetrieveAPIView, and DestroyAPIView, and answers conditional GET requests with
+    ConditionalGetMixin.
 
     Example Usage:
     ```python
@@ -32,8 +50,9 @@ class TransactionsView(ListAPIView, RetrieveAPIView, DestroyAPIView):
     - response: The HTTP response object containing the serialized data and status code.
     """
 
-    queryset = Transaction.objects.all()
+    queryset = Transaction.objects.order_by("-created_at", "-id")
     serializer_class = TransactionReadSerializer
+    filter_backends = [TransactionFilterBackend]
 
     def get_serializer_class(self):
         if self.request.method == "GET":
@@ -45,7 +64,9 @@ class TransactionsView(ListAPIView, RetrieveAPIView, DestroyAPIView):
         Handles GET requests for retrieving a list of transactions or a single transaction.
 
         If a `pk` parameter is provided, it calls the `retrieve` method to retrieve a single transaction.
-        Otherwise, it retrieves a list of transactions from the database and returns the serialized data.
+        Otherwise, it retrieves a list of transactions from the database, newest first and filtered by
+        `TransactionFilterBackend`, and returns the data serialized by `transaction_values`, the fast read path of
+        `TransactionReadSerializer`.
 
         Inputs:
         - request: The HTTP request object containing the data for the request.
@@ -58,13 +79,142 @@ class TransactionsView(ListAPIView, RetrieveAPIView, DestroyAPIView):
         transaction_pk = self.kwargs.get("pk")
         if transaction_pk:
             return self.retrieve(request, *args, **kwargs)
-        transactions = self.get_queryset()
+        transactions = transaction_values.values(self.filter_queryset(self.get_queryset()))
         page = self.paginate_queryset(transactions)
         if page is not None:
-            serializer = self.get_serializer_class()(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer_class()(transactions, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            return self.get_paginated_response(transaction_values.to_representation(page))
+        return Response(transaction_values.to_representation(transactions), status=status.HTTP_200_OK)
+
+
+class ClientTransactionsView(ListAPIView):
+    """
+    A view for listing the transactions timeline of a client.
+
+    Example Usage:
+    ```python
+    # Create an instance of ClientTransactionsView
+    view = ClientTransactionsView()
+    # Handle a GET request to list the latest transactions of a client
+    response = view.list(request, pk)  # GET /api/clients/1/transactions/
+    ```
+
+    Inputs:
+    - request: The HTTP request object, with the `cursor` and `page_size` of `KeysetPagination` and the filter query
+      parameters of `TransactionsView`.
+    - pk: The primary key of the client.
+
+    Outputs:
+    - response: The HTTP response object containing a page of the client transactions, newest first.
+    """
+
+    serializer_class = TransactionReadSerializer
+    filter_backends = [TransactionFilterBackend]
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        """
+        Handles GET requests for the transactions timeline of a client.
+
+        The transactions are read through the `transactions` relation of the client and paginated on
+        (`created_at`, `id`), so every page is a range scan of the (`client`, `created_at`, `id`) index.
+
+        Inputs:
+        - request: The HTTP request object containing the data for the request.
+        - args: Additional positional arguments.
+        - kwargs: Additional keyword arguments.
+
+        Outputs:
+        - response: The HTTP response object containing the serialized data and status code.
+        """
+        client = get_object_or_404(Client.objects.only("id"), pk=self.kwargs["pk"])
+        transactions = transaction_values.values(self.filter_queryset(client.transactions.all()))
+        page = self.paginate_queryset(transactions)
+        return self.get_paginated_response(transaction_values.to_representation(page))
+
+
+class TransactionsExportView(GenericAPIView):
+    """
+    A view for exporting transactions in a single streamed response.
+
+    Example Usage:
+    ```python
+    # Create an instance of TransactionsExportView
+    view = TransactionsExportView()
+    # Handle a GET request to export the failed transactions of a client as CSV
+    response = view.get(request)  # GET /api/transactions/export/?export_format=csv&client=1&result=false
+    ```
+
+    Inputs:
+    - request: The HTTP request object, with the `export_format` (`ndjson` by default, or `csv`) and the same filter
+      query parameters as `TransactionsView`.
+
+    Outputs:
+    - response: A streaming HTTP response with a row per transaction, with the fields of `TransactionReadSerializer`.
+    """
+
+    queryset = Transaction.objects.all()
+    filter_backends = [TransactionFilterBackend]
+
+    def get(self, request):
+        """
+        Handles GET requests to export the filtered transactions, oldest first.
+
+        The rows are read from the database and encoded in chunks while the response is sent, so the memory used does
+        not depend on the number of exported transactions.
+
+        Inputs:
+        - request: The HTTP request object containing the data for the request.
+
+        Outputs:
+        - response: The streaming HTTP response.
+        """
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"export_format": f"Must be one of: {', '.join(EXPORT_FORMATS)}."})
+        transactions = self.filter_queryset(self.get_queryset()).order_by("created_at", "id")
+        stream = stream_csv if export_format == "csv" else stream_ndjson
+        response = StreamingHttpResponse(stream(export_rows(transactions)), content_type=EXPORT_FORMATS[export_format])
+        response["Content-Disposition"] = f'attachment; filename="transactions.{export_format}"'
+        return response
+
+
+class TransactionStatsView(APIView):
+    """
+    A view for reading the validation statistics per client and day.
+
+    Example Usage:
+    ```python
+    # Create an instance of TransactionStatsView
+    view = TransactionStatsView()
+    # Handle a GET request to read the statistics of a client in October
+    response = view.get(request)  # GET /api/transactions/stats/?client=1&date_from=2023-10-01&date_to=2023-10-31
+    ```
+
+    Inputs:
+    - request: The HTTP request object, with the optional `client`, `date_from` and `date_to` query parameters.
+
+    Outputs:
+    - response: The HTTP response object with the succeeded and failed counts and the error code histogram of every
+      client and day.
+    """
+
+    def get(self, request):
+        """
+        Handles GET requests to read the validation statistics.
+
+        The statistics are only read from the `TransactionStat` rollup, so the cost depends on the number of clients
+        and days, not on the number of transactions.
+
+        Inputs:
+        - request: The HTTP request object containing the data for the request.
+
+        Outputs:
+        - response: The HTTP response object containing the statistics and status code.
+        """
+        filters = TransactionStatsFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        stats = summarize_stats(filters.filter_queryset(TransactionStat.objects.all()))
+        return Response({"results": stats}, status=status.HTTP_200_OK)
 
 
 class ValidateView(APIView):
@@ -80,13 +230,16 @@ class ValidateView(APIView):
     ```
 
     Inputs:
-    - request: The HTTP request object containing the data for the request.
+    - request: The HTTP request object containing the data for the request. The images can be sent as base64 data
+      URIs in a JSON body, as `multipart/form-data` files, or as a raw `application/octet-stream` body parsed by
+      `ValidateOctetStreamParser`. Uploaded files are validated and stored straight from Django's upload handlers.
 
     Outputs:
     - response: The HTTP response object containing the serialized data and status code.
     """
 
     serializer_class = ValidateSerializer
+    parser_classes = [JSONParser, MultiPartParser, FormParser, ValidateOctetStreamParser]
 
     def post(self, request):
         """
@@ -97,6 +250,13 @@ class ValidateView(APIView):
         If the serializer is not valid, it calls the `failed` method of the serializer to handle the failed transaction
         and returns the serializer errors with a status code of 400.
 
+        A request with the same client and images as a recent one is answered with the cached result of that
+        validation, without validating the images again nor creating another transaction.
+
+        With `?mode=async` the transaction is persisted as pending and returned with a status code of 202, its images
+        are validated by the worker pool and the result can be read through `TransactionsView`. Payloads whose images
+        cannot be decoded are still rejected synchronously.
+
         Inputs:
         - request: The HTTP request object containing the data for the request.
 
@@ -104,8 +264,62 @@ class ValidateView(APIView):
         - response: The HTTP response object containing the serialized data and status code.
         """
         serializer = self.serializer_class(data=request.data)
+        if request.query_params.get("mode") == "async":
+            transaction = serializer.accept(request.data)
+            if transaction is not None:
+                workers.enqueue(transaction.id)
+                return Response(
+                    {"id": transaction.id, "status": transaction.status},
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={"Location": f"/api/transactions/{transaction.id}/"},
+                )
+        cached_result = serializer.get_cached_result()
+        if cached_result is not None:
+            return Response(cached_result["data"], status=cached_result["status"])
         if serializer.is_valid():
             serializer.save()
+            serializer.cache_result(dict(serializer.data), status.HTTP_201_CREATED)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         serializer.failed(details=serializer.errors, data=request.data)
+        serializer.cache_result(dict(serializer.errors), status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ValidateBatchView(APIView):
+    """
+    A view for handling POST requests to validate and create many transactions at once.
+
+    Example Usage:
+    ```python
+    # Create an instance of ValidateBatchView
+    view = ValidateBatchView()
+    # Handle a POST request to validate and create a batch of transactions
+    response = view.post(request)
+    ```
+
+    Inputs:
+    - request: The HTTP request object containing the `items` to validate.
+
+    Outputs:
+    - response: The HTTP response object containing the per-item results and status code.
+    """
+
+    serializer_class = ValidateBatchSerializer
+
+    def post(self, request):
+        """
+        Handles POST requests to validate and create a batch of transactions.
+
+        Every item is validated like in `ValidateView`. Successful and failed transactions are persisted together and
+        the results are returned in the same order as the received items, failed ones including their errors.
+
+        Inputs:
+        - request: The HTTP request object containing the data for the request.
+
+        Outputs:
+        - response: The HTTP response object containing the per-item results and status code.
+        """
+        serializer = self.serializer_class(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,181 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.utils import timezone
+
+from apps.transactions.models import ErrorCodeChoices, Transaction, TransactionStatusChoices
+from apps.transactions.serializers import ValidateSerializer
+from apps.transactions.serializers_utils import format_errors, select_error_code
+from apps.transactions.stats import record_transactions
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the worker pool shared by the whole process, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: The worker pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.TRANSACTIONS_WORKER_POOL_SIZE, thread_name_prefix="transactions-worker"
+            )
+        return _executor
+
+
+def enqueue(transaction_id):
+    """
+    Schedules the validation of a pending transaction once the current database transaction commits.
+
+    Args:
+        transaction_id (int): The id of the pending transaction.
+    """
+    transaction.on_commit(lambda: get_executor().submit(_run, transaction_id))
+
+
+def _run(transaction_id):
+    """
+    Processes a transaction inside a worker thread and releases the thread database connections afterwards.
+
+    Args:
+        transaction_id (int): The id of the pending transaction.
+    """
+    try:
+        process_transaction(transaction_id)
+    except Exception:
+        logger.exception("Failed to process transaction %s", transaction_id)
+    finally:
+        connections.close_all()
+
+
+def claim(transaction_id):
+    """
+    Marks a pending transaction as processing.
+
+    The status is switched with a conditional UPDATE, so only one worker can claim a transaction even when several
+    processes drain the queue at the same time.
+
+    Args:
+        transaction_id (int): The id of the pending transaction.
+
+    Returns:
+        bool: Whether the transaction was claimed.
+    """
+    claimed = Transaction.objects.filter(id=transaction_id, status=TransactionStatusChoices.PENDING).update(
+        status=TransactionStatusChoices.PROCESSING, updated_at=timezone.now()
+    )
+    return claimed == 1
+
+
+def process_transaction(transaction_id):
+    """
+    Validates the images of a pending transaction and stores its result.
+
+    The stored images are validated with `ValidateSerializer`, so the result, error code and details are the same
+    as the ones of a synchronous validation. A transaction whose validation raises an unexpected error is completed
+    as failed with `ErrorCodeChoices.PROCESSING_ERROR`, so it is never left processing and retried forever.
+
+    Args:
+        transaction_id (int): The id of the pending transaction.
+
+    Returns:
+        Transaction: The completed transaction, or None if it was not pending.
+    """
+    if not claim(transaction_id):
+        return None
+    try:
+        return validate_transaction(transaction_id)
+    except Exception as e:
+        logger.exception("Failed to validate transaction %s", transaction_id)
+        return complete_transaction(
+            Transaction.objects.get(id=transaction_id),
+            False,
+            ErrorCodeChoices.PROCESSING_ERROR,
+            f"Processing error, {e}",
+        )
+
+
+def validate_transaction(transaction_id):
+    """
+    Validates the stored images of a claimed transaction and completes it with the result.
+
+    Args:
+        transaction_id (int): The id of the claimed transaction.
+
+    Returns:
+        Transaction: The completed transaction.
+    """
+    instance = Transaction.objects.select_related("client").get(id=transaction_id)
+    with instance.frontside_image.open("rb") as frontside_image, instance.backside_image.open("rb") as backside_image:
+        serializer = ValidateSerializer(
+            data={
+                "client": instance.client_id or 0,
+                "frontside_image": File(frontside_image, name=frontside_image.name),
+                "backside_image": File(backside_image, name=backside_image.name),
+            },
+            context={"clients": {instance.client_id: instance.client}},
+        )
+        is_valid = serializer.is_valid()
+    if is_valid:
+        return complete_transaction(instance, True, None, None)
+    return complete_transaction(
+        instance, False, select_error_code(serializer.errors), format_errors(error_dict=serializer.errors)
+    )
+
+
+def complete_transaction(instance, result, error_code, details):
+    """
+    Stores the result of a transaction and adds it to the validation statistics.
+
+    Args:
+        instance (Transaction): The claimed transaction.
+        result (bool): Whether the transaction is valid.
+        error_code (int): The error code, None for a valid transaction.
+        details (str): The error details, None for a valid transaction.
+
+    Returns:
+        Transaction: The completed transaction.
+    """
+    instance.result = result
+    instance.error_code = error_code
+    instance.details = details
+    instance.status = TransactionStatusChoices.COMPLETED
+    instance.save(update_fields=["result", "error_code", "details", "status", "updated_at"])
+    record_transactions([instance])
+    return instance
+
+
+def process_pending(stale_after=None):
+    """
+    Processes every pending transaction, for example the ones left in the queue by a restart.
+
+    Args:
+        stale_after (int, optional): Seconds after which a transaction that is still processing is considered
+            abandoned by a dead worker and is queued again.
+
+    Returns:
+        int: The number of processed transactions.
+    """
+    if stale_after is not None:
+        Transaction.objects.filter(
+            status=TransactionStatusChoices.PROCESSING,
+            updated_at__lt=timezone.now() - timedelta(seconds=stale_after),
+        ).update(status=TransactionStatusChoices.PENDING, updated_at=timezone.now())
+    pending_ids = Transaction.objects.filter(status=TransactionStatusChoices.PENDING).order_by("id")
+    processed = 0
+    for transaction_id in pending_ids.values_list("id", flat=True).iterator():
+        if process_transaction(transaction_id) is not None:
+            processed += 1
+    return processed
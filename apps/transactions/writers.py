@@ -0,0 +1,309 @@
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+
+from apps.transactions.models import Transaction
+from apps.transactions.stats import record_transactions
+from apps.transactions.storage import ContentAddressedStorage, PackFileStorage
+
+logger = logging.getLogger(__name__)
+
+RECORD_FIELDS = ("client_id", "frontside_image", "backside_image", "result", "error_code", "details")
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_failed_writer():
+    """
+    Returns the failed transactions writer shared by the whole process, creating and starting it on first use.
+
+    Returns:
+        FailedTransactionWriter: The writer.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            options = settings.TRANSACTIONS_FAILED_WRITER
+            _writer = FailedTransactionWriter(
+                batch_size=options["BATCH_SIZE"],
+                flush_interval=options["FLUSH_INTERVAL"],
+                spool_dir=options["SPOOL_DIR"],
+            )
+            _writer.start()
+        return _writer
+
+
+class FailedTransactionWriter:
+    """
+    Write-behind buffer for the failed transactions of the validate endpoint.
+
+    `submit` stores the images, appends the transaction record to a local NDJSON spool file and buffers it; a
+    background thread inserts the buffered records with a single `bulk_create` every `flush_interval` seconds, or as
+    soon as `batch_size` records are buffered. The request never waits on the insert.
+
+    Every flush starts a new spool file, which is removed once its records are committed. The active spool file is
+    locked by its process; spool files that are not locked (left by a process that died, or by a failed insert) are
+    replayed when a writer starts, so a record is inserted at least once. Pending records are flushed at exit.
+    Records that cannot be inserted, or spooled lines that cannot be parsed, are moved to a `.rejected` file next to
+    the spool file rather than replayed again.
+
+    Note that `created_at` is set when the record is inserted, up to `flush_interval` seconds after the request.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=1.0, spool_dir="spool"):
+        """
+        FailedTransactionWriter class constructor
+
+        Args:
+            batch_size (int): The number of buffered records that triggers a flush.
+            flush_interval (float): The maximum number of seconds a record stays buffered.
+            spool_dir (str): The directory of the spool files.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_dir = str(spool_dir)
+        self.records = []
+        self.spool = None
+        self.spool_path = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.retry = False
+
+    def start(self):
+        """
+        Replays the spool files left by previous processes and starts the flusher thread.
+        """
+        os.makedirs(self.spool_dir, exist_ok=True)
+        try:
+            self.replay()
+        except Exception:
+            logger.exception("Failed to replay the failed transactions spool files")
+            self.retry = True
+        self.thread = threading.Thread(target=self._run, name="failed-transactions-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Stops the flusher thread and flushes the buffered records.
+        """
+        self.stopped.set()
+        self.wakeup.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def submit(self, instance):
+        """
+        Buffers an unsaved failed transaction.
+
+        The images are written to the storage before the record is spooled, so the record only keeps their names.
+
+        Args:
+            instance (Transaction): The unsaved failed transaction, as built by `ValidateSerializer.build_failed`.
+        """
+        for field_name in ("frontside_image", "backside_image"):
+            field_file = getattr(instance, field_name)
+            if field_file and not field_file._committed:
+                field_file.save(field_file.name, field_file.file, save=False)
+        record = {field_name: getattr(instance, field_name) for field_name in RECORD_FIELDS}
+        record["frontside_image"] = instance.frontside_image.name or ""
+        record["backside_image"] = instance.backside_image.name or ""
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            if self.spool is None:
+                self.spool, self.spool_path = self._open_spool()
+            self.spool.write(line)
+            self.spool.flush()
+            self.records.append(record)
+            full = len(self.records) >= self.batch_size
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        """
+        Inserts the buffered records and removes their spool file.
+
+        If the insert fails the spool file is kept, unlocked, and its records are replayed by the flusher thread.
+
+        Returns:
+            int: The number of inserted records.
+        """
+        with self.flush_lock:
+            with self.lock:
+                records, spool, path = self.records, self.spool, self.spool_path
+                self.records, self.spool, self.spool_path = [], None, None
+            if spool is None:
+                return 0
+            try:
+                self._insert(records)
+            except Exception:
+                logger.exception("Failed to insert %d failed transactions, kept in %s", len(records), path)
+                spool.close()
+                self.retry = True
+                return 0
+            os.remove(path)
+            spool.close()
+            return len(records)
+
+    def replay(self):
+        """
+        Inserts the records of the spool files that are not locked by a running writer.
+
+        Every file is replayed on its own. An incomplete last line, written by a process that died while spooling it,
+        is skipped; the lines that cannot be parsed and the records that cannot be inserted are moved to the
+        `.rejected` file of the spool file, so they never block the replay of the other files.
+
+        Returns:
+            int: The number of inserted records.
+
+        Raises:
+            OperationalError, InterfaceError: If the database is unavailable, the spool file being replayed is kept.
+        """
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "failed-*.ndjson"))):
+            try:
+                spool = open(path, "r+")
+            except FileNotFoundError:
+                continue
+            with spool:
+                try:
+                    fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                if os.fstat(spool.fileno()).st_nlink == 0:
+                    continue
+                records, rejected = self._read_spool(spool, path)
+                replayed += self._replay_records(records, rejected)
+                if rejected:
+                    with open(f"{path}.rejected", "a") as rejected_file:
+                        rejected_file.writelines(f"{line}\n" for line in rejected)
+                    logger.error("Rejected %d failed transactions of %s", len(rejected), path)
+                os.remove(path)
+        return replayed
+
+    @staticmethod
+    def _read_spool(spool, path):
+        """
+        Reads the records of a spool file.
+
+        Returns:
+            tuple: The record dicts and the lines that are not valid records.
+        """
+        *lines, incomplete = spool.read().split("\n")
+        if incomplete:
+            logger.warning("Skipped the incomplete last line of %s", path)
+        records, rejected = [], []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                rejected.append(line)
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+            else:
+                rejected.append(line)
+        return records, rejected
+
+    def _replay_records(self, records, rejected):
+        """
+        Inserts replayed records, one at a time when the batch fails, adding the records that fail to `rejected`.
+
+        The image references the rejected records took when they were submitted are released.
+
+        Returns:
+            int: The number of inserted records.
+        """
+        try:
+            self._insert(records)
+            return len(records)
+        except (OperationalError, InterfaceError):
+            raise
+        except Exception:
+            logger.exception("Failed to replay %d failed transactions, inserting them one at a time", len(records))
+        inserted = 0
+        for record in records:
+            try:
+                self._insert([record])
+                inserted += 1
+            except (OperationalError, InterfaceError):
+                raise
+            except Exception:
+                rejected.append(json.dumps(record))
+                self._release_images(record)
+        return inserted
+
+    @staticmethod
+    def _release_images(record):
+        """
+        Releases the image blob references, or pack index entries, of a record that will never be inserted.
+        """
+        for field_name in ("frontside_image", "backside_image"):
+            storage = Transaction._meta.get_field(field_name).storage
+            name = record.get(field_name)
+            if name and isinstance(storage, (ContentAddressedStorage, PackFileStorage)):
+                try:
+                    storage.delete(name)
+                except Exception:
+                    logger.exception("Failed to release the image %s of a rejected failed transaction", name)
+
+    def _run(self):
+        """
+        Flushes the buffer every `flush_interval` seconds, or earlier when it is full, until the writer stops.
+        """
+        while not self.stopped.is_set():
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush the failed transactions")
+            if self.retry:
+                try:
+                    self.retry = False
+                    self.replay()
+                except Exception:
+                    logger.exception("Failed to replay the failed transactions spool files")
+                    self.retry = True
+
+    def _open_spool(self):
+        """
+        Opens a new spool file, locked for as long as this process writes or flushes it.
+
+        The file is created and locked under a temporary name that `replay` ignores, then renamed, so a replaying
+        process never finds it unlocked.
+
+        Returns:
+            tuple: The spool file and its path.
+        """
+        path = os.path.join(self.spool_dir, f"failed-{os.getpid()}-{uuid.uuid4().hex}.ndjson")
+        spool = open(f"{path}.tmp", "a")
+        fcntl.flock(spool, fcntl.LOCK_EX)
+        os.rename(f"{path}.tmp", path)
+        return spool, path
+
+    @staticmethod
+    def _insert(records):
+        """
+        Inserts records with a single `bulk_create` and adds them to the validation statistics.
+        """
+        if records:
+            with transaction.atomic():
+                transactions = Transaction.objects.bulk_create([Transaction(**record) for record in records])
+                record_transactions(transactions)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
+
+    def ready(self):
+        """
+        Registers the signal receivers of the users app.
+        """
+        from apps.users import signals  # noqa: F401
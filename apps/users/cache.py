@@ -0,0 +1,150 @@
+import uuid
+
+from django.conf import settings
+
+from apps.users.models import Client
+from apps.utils.cache import MeteredCache
+
+client_cache = MeteredCache(namespace="clients", alias="clients")
+client_responses_cache = MeteredCache(namespace="client_responses", alias="responses")
+
+MISSING = False
+
+
+def get_client(client_id):
+    """
+    Returns an active client, reading it from the clients cache.
+
+    Unknown and soft deleted ids are cached too, for `CLIENTS_CACHE_NEGATIVE_TIMEOUT` seconds, so repeated lookups of
+    ids that do not exist never reach the database. The entries are invalidated by the `Client` signal receivers.
+
+    Args:
+        client_id (int): The client id.
+
+    Returns:
+        Client: The client, or None if it does not exist or is deleted.
+    """
+    client = client_cache.get(client_id)
+    if client is None:
+        client = Client.objects.filter(id=client_id).first()
+        cache_client(client_id, client)
+    return client or None
+
+
+def get_clients(client_ids):
+    """
+    Returns many active clients, reading the cached ones from the clients cache and the others with a single query.
+
+    Args:
+        client_ids (iterable): The client ids.
+
+    Returns:
+        dict: The existing clients by id.
+    """
+    clients, missed = {}, set()
+    for client_id in client_ids:
+        client = client_cache.get(client_id)
+        if client is None:
+            missed.add(client_id)
+        elif client is not MISSING:
+            clients[client_id] = client
+    if missed:
+        loaded = Client.objects.in_bulk(missed)
+        for client_id in missed:
+            cache_client(client_id, loaded.get(client_id))
+        clients.update(loaded)
+    return clients
+
+
+def cache_client(client_id, client):
+    """
+    Caches a client, or the absence of a client.
+
+    Args:
+        client_id (int): The client id.
+        client (Client): The client, or None if it does not exist or is deleted.
+    """
+    if client is None:
+        client_cache.set(client_id, MISSING, timeout=settings.CLIENTS_CACHE_NEGATIVE_TIMEOUT)
+    else:
+        client_cache.set(client_id, client)
+
+
+def invalidate_client(client_id):
+    """
+    Removes a client from the clients cache.
+
+    Args:
+        client_id (int): The client id.
+    """
+    client_cache.delete(client_id)
+
+
+def client_list_response_key(path):
+    """
+    Returns the responses cache key of a page of the clients list.
+
+    The key includes the current version of the list, which every client write replaces, so the pages cached before
+    a write are never read again.
+
+    Args:
+        path (str): The request path with its query string.
+
+    Returns:
+        str: The cache key.
+    """
+    return f"list:{get_response_version('list')}:{path}"
+
+
+def client_response_key(client_id):
+    """
+    Returns the responses cache key of a client detail, including the current version of the client.
+
+    Args:
+        client_id (int): The client id.
+
+    Returns:
+        str: The cache key.
+    """
+    return f"detail:{client_id}:{get_response_version(client_id)}"
+
+
+def get_response_version(scope):
+    """
+    Returns the version of the cached list or client responses, creating it when missing.
+
+    Versions are random tokens rather than counters, so a version evicted from the cache never matches the keys of
+    the responses cached before the eviction. The version of a client also keys the cached validation results of
+    its transactions, see `apps.transactions.cache.validation_cache_key`.
+
+    Args:
+        scope: "list", or a client id.
+
+    Returns:
+        str: The version.
+    """
+    cache, key = client_responses_cache.cache, client_responses_cache.make_key(f"version:{scope}")
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_client_responses(client_id):
+    """
+    Invalidates the cached clients list pages and the cached detail of a client.
+
+    Args:
+        client_id (int): The client id.
+    """
+    cache = client_responses_cache.cache
+    for scope in ("list", client_id):
+        cache.set(client_responses_cache.make_key(f"version:{scope}"), uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_client_list_responses():
+    """
+    Invalidates the cached clients list pages, without invalidating any cached client detail.
+    """
+    client_responses_cache.cache.set(client_responses_cache.make_key("version:list"), uuid.uuid4().hex, timeout=None)
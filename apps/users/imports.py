@@ -0,0 +1,186 @@
+import codecs
+import csv
+import json
+
+from django.db import transaction
+
+from apps.users.cache import invalidate_client, invalidate_client_list_responses
+from apps.users.models import Client
+from apps.users.serializers import ClientWriteSerializer
+
+IMPORT_READ_SIZE = 64 * 1024
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+def iter_lines(stream, encoding="utf-8", read_size=IMPORT_READ_SIZE):
+    """
+    Reads the lines of a binary stream, `read_size` bytes at a time, so the whole body is never held in memory.
+
+    Args:
+        stream: The binary stream, the request body.
+        encoding (str, optional): The body encoding.
+        read_size (int, optional): The number of bytes read at a time.
+
+    Returns:
+        generator: The decoded lines, with their line ending.
+
+    Raises:
+        UnicodeDecodeError: If the body is not encoded with `encoding`.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    while stream is not None:
+        chunk = stream.read(read_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def parse_ndjson(lines):
+    """
+    Parses NDJSON lines, skipping the blank ones.
+
+    Args:
+        lines (iterable): The lines.
+
+    Returns:
+        generator: (line number, row dict, None) tuples, or (line number, None, errors) for the invalid lines.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, {"non_field_errors": [f"Invalid JSON: {e}"]}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {"non_field_errors": ["Expected a JSON object."]}
+            continue
+        yield number, row, None
+
+
+def parse_csv(lines):
+    """
+    Parses CSV lines, the first one being the header with the client field names.
+
+    Args:
+        lines (iterable): The lines.
+
+    Returns:
+        generator: (line number, row dict, None) tuples, or (line number, None, errors) for the invalid lines.
+    """
+    reader = csv.DictReader(lines)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield reader.line_num, None, {"non_field_errors": [f"Invalid CSV: {e}"]}
+            continue
+        row.pop(None, None)
+        yield reader.line_num, row, None
+
+
+class ClientImporter:
+    """
+    Imports clients from parsed rows.
+
+    The rows are validated `batch_size` at a time with `ClientWriteSerializer`, the rules of `ClientsView.create`,
+    and the valid ones of every chunk are inserted with a single `bulk_create`, in their own database transaction.
+    Only the current chunk and the first `max_errors` row errors are kept in memory.
+
+    `bulk_create` sends no signals, so the clients cache entries of the created ids (the cached absence of a client)
+    and the cached clients list pages are invalidated after every chunk.
+    """
+
+    def __init__(self, batch_size=1000, max_errors=1000):
+        """
+        ClientImporter class constructor
+
+        Args:
+            batch_size (int, optional): The number of rows validated and inserted at a time.
+            max_errors (int, optional): The maximum number of row errors reported.
+        """
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.rows = self.created = self.failed = 0
+        self.errors = []
+
+    def run(self, rows):
+        """
+        Imports parsed rows.
+
+        Args:
+            rows (iterable): The (line number, row dict, errors) tuples of `parse_ndjson` or `parse_csv`.
+
+        Returns:
+            dict: The import report, see `report`.
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.batch_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.report()
+
+    def import_chunk(self, chunk):
+        """
+        Validates a chunk of rows and inserts its valid clients.
+
+        Args:
+            chunk (list): The (line number, row dict, errors) tuples.
+        """
+        clients = []
+        for number, row, errors in chunk:
+            self.rows += 1
+            if errors is None:
+                serializer = ClientWriteSerializer(data=row)
+                if serializer.is_valid():
+                    clients.append(Client(**serializer.validated_data))
+                    continue
+                errors = serializer.errors
+            self.add_error(number, errors)
+        if not clients:
+            return
+        with transaction.atomic():
+            clients = Client.objects.bulk_create(clients, batch_size=self.batch_size)
+        self.created += len(clients)
+        for client in clients:
+            if client.pk is not None:
+                invalidate_client(client.pk)
+        invalidate_client_list_responses()
+
+    def add_error(self, number, errors):
+        """
+        Counts an invalid row, keeping its errors while fewer than `max_errors` are reported.
+        """
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": number, "errors": errors})
+
+    def report(self):
+        """
+        Returns the import report.
+
+        Returns:
+            dict: The number of `rows` read, of clients `created` and of `failed` rows, the row `errors` and whether
+                they were `errors_truncated` to `max_errors`.
+        """
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
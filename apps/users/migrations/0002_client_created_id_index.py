@@ -0,0 +1,19 @@
+# Generated by Django 4.1.7 on 2026-10-16 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["created_at", "id"], name="clients_created_id_idx"
+            ),
+        ),
+    ]
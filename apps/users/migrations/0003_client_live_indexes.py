@@ -0,0 +1,25 @@
+# Generated by Django 4.1.7 on 2026-10-16 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_client_created_id_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="client",
+            name="clients_created_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["created_at", "id"],
+                name="clients_created_id_idx",
+            ),
+        ),
+    ]
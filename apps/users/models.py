@@ -2,7 +2,7 @@ from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 
 from apps.users.managers import UserAccountManager
-from apps.utils.models import BaseModel
+from apps.utils.models import BaseModel, live_index
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -34,6 +34,8 @@ class Client(BaseModel):
 
     Inherits common fields and methods from the `BaseModel` class, such as `created_at`, `updated_at`,
     `deleted_at`, and `is_active`.
+
+    `Client.objects.filter(...).soft_delete(cascade=True)` soft deletes the transactions of the clients as well.
     """
 
     first_name = models.CharField(max_length=255)
@@ -41,8 +43,11 @@ class Client(BaseModel):
     email = models.EmailField()
     phone_number = models.CharField(max_length=255, blank=True, null=True)
 
+    soft_delete_cascade = ("transactions",)
+
     class Meta:
         db_table = "clients"
+        indexes = [live_index("created_at", "id", name="clients_created_id_idx")]
 
     def __str__(self):
         """
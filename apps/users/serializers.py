@@ -3,6 +3,7 @@ from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 
 from apps.users.models import Client
+from apps.utils.serializers import ValuesSerializer
 
 User = get_user_model()
 
@@ -35,6 +36,30 @@ class ClientReadSerializer(serializers.ModelSerializer):
         )
 
 
+client_values = ValuesSerializer(ClientReadSerializer)
+
+
+class ClientStatsReadSerializer(ClientReadSerializer):
+    """
+    A serializer for reading client data with the activity annotated by
+    `apps.transactions.stats.annotate_client_activity`.
+    """
+
+    transactions_count = serializers.IntegerField(read_only=True)
+    failed_transactions_count = serializers.IntegerField(read_only=True)
+    last_transaction_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(ClientReadSerializer.Meta):
+        fields = ClientReadSerializer.Meta.fields + (
+            "transactions_count",
+            "failed_transactions_count",
+            "last_transaction_at",
+        )
+
+
+client_stats_values = ValuesSerializer(ClientStatsReadSerializer)
+
+
 class ClientWriteSerializer(serializers.ModelSerializer):
     """
     A serializer for writing client data.
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.cache import invalidate_client, invalidate_client_responses
+from apps.users.models import Client
+from apps.utils.models import post_soft_delete
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_cached_client(sender, instance, **kwargs):
+    """
+    Invalidates the cached client and client responses when it is created, updated, soft deleted (`BaseModel.delete`
+    saves the instance) or removed from the database.
+    """
+    invalidate_client(instance.id)
+    invalidate_client_responses(instance.id)
+
+
+@receiver(post_soft_delete, sender=Client)
+def invalidate_soft_deleted_clients(sender, pks, **kwargs):
+    """
+    Invalidates the cached clients and client responses of the clients soft deleted by `SoftDeleteQuerySet.soft_delete`.
+    """
+    for client_id in pks:
+        invalidate_client(client_id)
+        invalidate_client_responses(client_id)
@@ -1,3 +1,42 @@
+from django.core.cache import caches
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.users.models import Client, User
+
+
+class ClientsConditionalGetTests(TestCase):
+    """
+    Tests the ETag validation of the clients list pages.
+    """
+
+    def setUp(self):
+        caches["responses"].clear()
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_superuser("admin@example.com", "password"))
+        Client.objects.bulk_create(
+            [Client(first_name="a", last_name="b", email=f"client{index}@example.com") for index in range(25)]
+        )
+
+    def get(self, path, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.api.get(path, **headers)
+
+    def test_pages_have_different_etags(self):
+        first_page = self.get("/api/clients/")
+        second_page = self.get("/api/clients/?page=2")
+        self.assertEqual(first_page.status_code, 200)
+        self.assertTrue(first_page.has_header("ETag"))
+        self.assertNotEqual(first_page["ETag"], second_page["ETag"])
+
+    def test_etag_of_a_page_only_validates_that_page(self):
+        etag = self.get("/api/clients/")["ETag"]
+        self.assertEqual(self.get("/api/clients/", etag).status_code, 304)
+        response = self.get("/api/clients/?page=2", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_write_invalidates_the_etag(self):
+        etag = self.get("/api/clients/")["ETag"]
+        Client.objects.create(first_name="c", last_name="d", email="new@example.com")
+        self.assertEqual(self.get("/api/clients/", etag).status_code, 200)
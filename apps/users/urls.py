@@ -4,5 +4,6 @@ from . import views
 
 urlpatterns = [
     path('clients/', views.ClientsView.as_view()),
+    path('clients/import/', views.ClientsImportView.as_view()),
     path('clients/<int:pk>/', views.ClientsView.as_view()),
 ]
@@ -1,19 +1,33 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from rest_framework import generics, status
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.transactions.stats import annotate_client_activity
+from apps.users.cache import client_list_response_key, client_response_key, client_responses_cache
+from apps.users.imports import IMPORT_FORMATS, ClientImporter, iter_lines, parse_csv, parse_ndjson
 from apps.users.models import Client
-from apps.users.serializers import ClientReadSerializer, ClientWriteSerializer
+from apps.users.serializers import ClientReadSerializer, ClientWriteSerializer, client_stats_values, client_values
+from apps.utils.views import ConditionalGetMixin
 
 
-class ClientsView(generics.ListAPIView, generics.CreateAPIView, generics.RetrieveAPIView, generics.DestroyAPIView):
+class ClientsView(
+    ConditionalGetMixin,
+    generics.ListAPIView,
+    generics.CreateAPIView,
+    generics.RetrieveAPIView,
+    generics.DestroyAPIView,
+):
     """
     A class-based view for handling client-related operations in a Django REST framework.
 
-    Inherits from ListAPIView, CreateAPIView, RetrieveAPIView, and DestroyAPIView.
+    Inherits from ListAPIView, CreateAPIView, RetrieveAPIView, and DestroyAPIView, and answers conditional GET
+    requests with ConditionalGetMixin.
 
     Attributes:
         queryset (QuerySet): The list of clients to be used in the views.
@@ -39,7 +53,7 @@ class ClientsView(generics.ListAPIView, generics.CreateAPIView, generics.Retriev
         response = clients_view.destroy(request, pk)
     """
 
-    queryset = Client.objects.all()
+    queryset = Client.objects.order_by("-created_at", "-id")
     serializer_class = ClientReadSerializer
 
     def get_serializer_class(self):
@@ -53,10 +67,53 @@ class ClientsView(generics.ListAPIView, generics.CreateAPIView, generics.Retriev
             return ClientReadSerializer
         return ClientWriteSerializer
 
+    @cached_property
+    def with_stats(self):
+        """
+        Returns whether the clients list is requested with their transactions activity (`?with_stats=true`).
+        """
+        return not self.kwargs.get("pk") and self.request.query_params.get("with_stats") in ("true", "1")
+
+    @cached_property
+    def response_cache_key(self):
+        """
+        Returns the responses cache key of the request, computed once when the request starts so that a response
+        built while a client is written is cached under a version that write already replaced.
+        """
+        client_pk = self.kwargs.get("pk")
+        if client_pk:
+            return client_response_key(client_pk)
+        return client_list_response_key(self.request.get_full_path())
+
+    @cached_property
+    def cached_response(self):
+        """
+        Returns the cached data and validators of the request response, or None on a miss.
+        """
+        return client_responses_cache.get(self.response_cache_key)
+
+    def get_validators(self):
+        """
+        Returns the validators of the cached response, so a cached response is validated without any query.
+
+        Lists with the transactions activity change with every transaction, they are never validated nor cached.
+        """
+        if self.with_stats:
+            return None, None
+        if self.cached_response is not None:
+            return self.cached_response["validators"]
+        return super().get_validators()
+
     def list(self, request, *args, **kwargs):
         """
         Handles GET requests to list all clients or retrieve a specific client.
 
+        The list, newest first, is serialized by `client_values`, the fast read path of `ClientReadSerializer`. The
+        list pages and client details are cached in the responses cache, until a client write invalidates them.
+
+        With `?with_stats=true` every client of the list is annotated, in the same query, with its number of
+        transactions, of failed transactions and its last transaction time.
+
         Args:
             request (Request): The HTTP request object.
             *args: Variable length argument list.
@@ -65,16 +122,36 @@ class ClientsView(generics.ListAPIView, generics.CreateAPIView, generics.Retriev
         Returns:
             Response: The serialized data or the retrieved client object.
         """
+        if self.with_stats:
+            return self.list_clients(annotate_client_activity(self.get_queryset()), client_stats_values)
+        if self.cached_response is not None:
+            return Response(self.cached_response["data"], status=status.HTTP_200_OK)
         client_pk = self.kwargs.get("pk")
         if client_pk:
-            return self.retrieve(request, *args, **kwargs)
-        queryset = self.get_queryset()
-        page = self.paginate_queryset(queryset)
+            response = self.retrieve(request, *args, **kwargs)
+        else:
+            response = self.list_clients(self.get_queryset(), client_values)
+        if response.status_code == status.HTTP_200_OK:
+            validators = getattr(self, "validators", (None, None))
+            client_responses_cache.set(self.response_cache_key, {"data": response.data, "validators": validators})
+        return response
+
+    def list_clients(self, queryset, values_serializer):
+        """
+        Lists a page of clients.
+
+        Args:
+            queryset (QuerySet): The clients queryset.
+            values_serializer (ValuesSerializer): The serializer of the client rows.
+
+        Returns:
+            Response: The serialized page.
+        """
+        rows = values_serializer.values(queryset)
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.get_serializer_class()(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer_class()(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            return self.get_paginated_response(values_serializer.to_representation(page))
+        return Response(values_serializer.to_representation(rows), status=status.HTTP_200_OK)
 
     def create(self, request):
         """
@@ -122,3 +199,47 @@ class ClientsView(generics.ListAPIView, generics.CreateAPIView, generics.Retriev
         client = get_object_or_404(Client, pk=pk)
         client.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ClientsImportView(APIView):
+    """
+    A view for importing many clients from a single streamed request body.
+
+    Example Usage:
+        # Import the clients of a CSV file
+        response = ClientsImportView().post(request)  # POST /api/clients/import/?import_format=csv
+
+    The body is NDJSON (`import_format=ndjson`, the default), one client object per line, or CSV
+    (`import_format=csv`) with a header line of client field names. It is read and imported in chunks while it is
+    received, see `ClientImporter`.
+    """
+
+    def post(self, request):
+        """
+        Handles POST requests to import clients.
+
+        The clients of the valid rows are created even when other rows are invalid. A body that is not UTF-8 stops the
+        import, the clients of the chunks read before it are kept.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The import report of `ClientImporter.report`, listing the invalid rows.
+
+        Raises:
+            ValidationError: If the import format is unknown.
+            ParseError: If the body is not UTF-8.
+        """
+        import_format = request.query_params.get("import_format", "ndjson")
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError({"import_format": f"Must be one of: {', '.join(IMPORT_FORMATS)}."})
+        parse = parse_csv if import_format == "csv" else parse_ndjson
+        importer = ClientImporter(
+            batch_size=settings.CLIENTS_IMPORT_BATCH_SIZE, max_errors=settings.CLIENTS_IMPORT_MAX_ERRORS
+        )
+        try:
+            report = importer.run(parse(iter_lines(request.stream)))
+        except UnicodeDecodeError as e:
+            raise ParseError(f"Invalid body encoding, {e}. {importer.created} clients were imported.")
+        return Response(report, status=status.HTTP_200_OK)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class UtilsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.utils'
+
+    def ready(self):
+        """
+        Registers the system checks of the utils app.
+        """
+        from apps.utils import checks  # noqa: F401
@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.core.checks import Tags, Warning, register
+
+from apps.utils.models import SOFT_DELETE_CONDITION, BaseModel
+
+
+@register(Tags.models)
+def check_soft_delete_indexes(app_configs, **kwargs):
+    """
+    Warns about the soft delete models without a partial index on their rows that are not soft deleted.
+
+    Args:
+        app_configs (list): The checked app configs, or None to check every installed app.
+
+    Returns:
+        list: A warning per `BaseModel` subclass without any index declared with `live_index`.
+    """
+    if app_configs is None:
+        models = apps.get_models()
+    else:
+        models = [model for app_config in app_configs for model in app_config.get_models()]
+    warnings = []
+    for model in models:
+        if not issubclass(model, BaseModel):
+            continue
+        if not any(index.condition == SOFT_DELETE_CONDITION for index in model._meta.indexes):
+            warnings.append(
+                Warning(
+                    f"{model._meta.label} is a soft delete model without a partial index on its live rows.",
+                    hint="Declare the columns it is usually queried by with `live_index` in its Meta.indexes.",
+                    obj=model,
+                    id="utils.W001",
+                )
+            )
+    return warnings
@@ -0,0 +1,46 @@
+import io
+
+
+class MemoryViewReader(io.RawIOBase):
+    """
+    Read-only file object over a memoryview, so a shared memory block or a memory mapped file can be read without
+    copying it whole.
+    """
+
+    def __init__(self, view):
+        """
+        MemoryViewReader class constructor
+
+        Args:
+            view (memoryview): The bytes to read.
+        """
+        super().__init__()
+        self.view = view
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self.view) - self.position)
+        buffer[:size] = self.view[self.position : self.position + size]
+        self.position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.position = max(offset, 0)
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        self.view.release()
+        super().close()
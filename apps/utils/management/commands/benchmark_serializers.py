@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.transactions.models import Transaction
+from apps.transactions.serializers import TransactionReadSerializer, transaction_values
+from apps.users.models import Client
+from apps.users.serializers import ClientReadSerializer, client_values
+
+
+class Command(BaseCommand):
+    """
+    Compares the list serialization of the `ModelSerializer`s with their `ValuesSerializer` read paths.
+
+    The rows are created inside a database transaction that is rolled back at the end, so the command can be run
+    against any database. Each page size is serialized `--repeat` times by both paths, including the query, and the
+    rendered JSON of both paths is checked to be identical.
+    """
+
+    help = "Benchmarks the transactions and clients list serializers against their values() read paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000], help="Rows per page")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per page size and serializer")
+
+    def handle(self, *args, **options):
+        sizes, repeat = options["sizes"], options["repeat"]
+        with transaction.atomic():
+            clients = Client.objects.bulk_create(
+                Client(first_name=f"First {i}", last_name=f"Last {i}", email=f"client{i}@example.com")
+                for i in range(max(sizes))
+            )
+            Transaction.objects.bulk_create(
+                Transaction(
+                    client=clients[i % len(clients)],
+                    frontside_image=f"images/frontside_images/{i}.png",
+                    backside_image=f"images/backside_images/{i}.png",
+                    result=i % 3 == 0,
+                    error_code=None if i % 3 == 0 else 1,
+                    details=None if i % 3 == 0 else "frontside_image: Invalid image",
+                )
+                for i in range(max(sizes))
+            )
+            benchmarks = (
+                ("transactions", Transaction.objects.order_by("-id"), TransactionReadSerializer, transaction_values),
+                ("clients", Client.objects.order_by("-id"), ClientReadSerializer, client_values),
+            )
+            self.stdout.write(f"{'list':<14}{'rows':>6}{'serializer ms':>16}{'values ms':>12}{'speedup':>10}")
+            for name, queryset, serializer_class, values_serializer in benchmarks:
+                for size in sizes:
+                    model_output = JSONRenderer().render(serializer_class(queryset[:size], many=True).data)
+                    values_output = JSONRenderer().render(
+                        values_serializer.to_representation(values_serializer.values(queryset)[:size])
+                    )
+                    if model_output != values_output:
+                        raise CommandError(f"The {name} outputs differ for {size} rows")
+                    model_time = self.measure(lambda: serializer_class(queryset[:size], many=True).data, repeat)
+                    values_time = self.measure(
+                        lambda: values_serializer.to_representation(values_serializer.values(queryset)[:size]), repeat
+                    )
+                    self.stdout.write(
+                        f"{name:<14}{size:>6}{model_time:>16.2f}{values_time:>12.2f}{model_time / values_time:>9.1f}x"
+                    )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(function, repeat):
+        """
+        Returns the median duration of a function in milliseconds.
+        """
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            durations.append((time.perf_counter() - start) * 1000)
+        return statistics.median(durations)
@@ -1,8 +1,52 @@
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.utils import timezone
 
 from apps.users.managers import UserAccountManager
 
+# Sent by `SoftDeleteQuerySet.soft_delete` for every batch of rows of a model it soft deletes, with the `pks` of the
+# rows, inside the database transaction of the soft delete.
+post_soft_delete = Signal()
+
+SOFT_DELETE_BATCH_SIZE = 1000
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    QuerySet of the `BaseModel` subclasses, with a set-based soft delete.
+    """
+
+    def soft_delete(self, cascade=False):
+        """
+        Soft deletes the rows of the queryset with an `UPDATE ... SET deleted_at` per `SOFT_DELETE_BATCH_SIZE` rows,
+        which sends no `post_save` signals, and sends `post_soft_delete` instead.
+
+        The ids of the live rows are read first, locking the rows with `SELECT ... FOR UPDATE` where the database
+        supports it, so the updates, the cascade and the signal receivers only see the rows this call soft deleted.
+
+        Args:
+            cascade (bool, optional): Whether to soft delete as well the rows related to the soft deleted ones through
+                the reverse relations named in the `soft_delete_cascade` attribute of the model.
+
+        Returns:
+            int: The number of soft deleted rows, without the cascaded ones.
+        """
+        model = self.model
+        deleted = 0
+        with transaction.atomic():
+            pks = list(self.filter(deleted_at=None).order_by().select_for_update().values_list("pk", flat=True))
+            deleted_at = timezone.now()
+            for start in range(0, len(pks), SOFT_DELETE_BATCH_SIZE):
+                batch = pks[start : start + SOFT_DELETE_BATCH_SIZE]
+                deleted += model.objects.filter(pk__in=batch).update(deleted_at=deleted_at, updated_at=deleted_at)
+                if cascade:
+                    for related_name in model.soft_delete_cascade:
+                        relation = model._meta.get_field(related_name)
+                        related_rows = relation.related_model.objects.filter(**{f"{relation.field.name}__in": batch})
+                        related_rows.soft_delete(cascade=True)
+                post_soft_delete.send(sender=model, pks=batch)
+        return deleted
+
 
 class SoftDeleteManager(UserAccountManager):
     """
@@ -25,8 +69,13 @@ class SoftDeleteManager(UserAccountManager):
 
     # Retrieve only non-deleted records
     non_deleted_records = MyModel.objects.all()
+
+    # Soft delete many records with a single query
+    MyModel.objects.filter(id__in=[1, 2]).soft_delete()
     """
 
+    _queryset_class = SoftDeleteQuerySet
+
     def __init__(self, *args, **kwargs):
         """
         Initializes the SoftDeleteManager class and sets the with_deleted attribute based on the deleted keyword
@@ -66,6 +115,27 @@ class SoftDeleteManager(UserAccountManager):
         return qs.filter(deleted_at=None)
 
 
+SOFT_DELETE_CONDITION = models.Q(deleted_at__isnull=True)
+
+
+def live_index(*fields, name):
+    """
+    Returns a partial index of the rows that are not soft deleted.
+
+    `SoftDeleteManager` adds `deleted_at IS NULL` to every query, so the database can answer them from an index
+    with that condition, which never grows with the soft deleted rows. The `check_soft_delete_indexes` system check
+    warns about `BaseModel` subclasses without any.
+
+    Args:
+        *fields (str): The indexed fields.
+        name (str): The index name.
+
+    Returns:
+        Index: The partial index.
+    """
+    return models.Index(fields=list(fields), name=name, condition=SOFT_DELETE_CONDITION)
+
+
 class BaseModel(models.Model):
     """
     Base model for all models.
@@ -87,6 +157,10 @@ class BaseModel(models.Model):
     Methods:
     - save(): Overrides the default save method to set the 'deleted_at' field if the instance is not active.
     - update(): A custom method that calls the save method to update an instance of the model.
+
+    Attributes:
+    - soft_delete_cascade: The reverse relations whose rows `SoftDeleteQuerySet.soft_delete(cascade=True)` soft
+                    deletes with the rows of the model.
     """
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -104,10 +178,13 @@ class BaseModel(models.Model):
 
     objects = SoftDeleteManager()
     objects_with_deleted = SoftDeleteManager(deleted=True)
+    soft_delete_cascade = ()
 
     def delete(self, *args, **kwargs):
         """
         Overrides the default delete method to set the 'deleted_at' field to the current date and time.
+
+        Only the `deleted_at` and `updated_at` columns are written.
         """
         self.deleted_at = timezone.now()
-        self.save()
+        self.save(update_fields=["deleted_at", "updated_at"])
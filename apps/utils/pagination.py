@@ -0,0 +1,340 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination on the (`created_at`, `id`) key, newest first.
+
+    Instead of counting the rows and skipping `OFFSET` rows, every page is read with a `WHERE (created_at, id) < key`
+    condition on the last row of the previous page, so it is served from the (`created_at`, `id`) index and a deep
+    page costs the same as the first one. Rows inserted while paginating never shift the pages.
+
+    The cursors are opaque base64 strings encoding the key of the first or last row of the page and the direction.
+    The response has the `next`, `previous` and `results` keys of `PageNumberPagination`, without `count`.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, page_size=None):
+        """
+        KeysetPagination class constructor
+
+        Args:
+            page_size (int, optional): The default page size, the `PAGE_SIZE` setting by default.
+        """
+        self.page_size = page_size or api_settings.PAGE_SIZE
+        self.request = None
+        self.has_next = self.has_previous = False
+        self.page = []
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Reads the page after, or before, the position of the request cursor.
+
+        Returns:
+            list: The page rows, newest first.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["reverse"]
+        if cursor is not None:
+            created_at, pk = cursor["created_at"], cursor["id"]
+            if reverse:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        ordering = ("created_at", "id") if reverse else ("-created_at", "-id")
+        rows = list(queryset.order_by(*ordering)[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        """
+        Returns the page size of the request, bounded by `max_page_size`.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, row, reverse):
+        """
+        Builds the URL of the page after (or before, when `reverse`) a row.
+        """
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    @staticmethod
+    def encode_cursor(row, reverse):
+        """
+        Encodes the key of a row, a model instance or a `values()` dict, and the direction into an opaque cursor.
+        """
+        created_at, pk = (row["created_at"], row["id"]) if isinstance(row, dict) else (row.created_at, row.id)
+        payload = {"c": created_at.isoformat(), "i": pk, "r": int(reverse)}
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        """
+        Decodes the request cursor.
+
+        Returns:
+            dict: The `created_at`, `id` and `reverse` of the cursor, or None when the request has no cursor.
+
+        Raises:
+            NotFound: If the cursor is invalid.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            return {
+                "created_at": datetime.fromisoformat(payload["c"]),
+                "id": int(payload["i"]),
+                "reverse": bool(payload.get("r")),
+            }
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+def estimate_count(queryset):
+    """
+    Returns the database estimate of the number of rows of a queryset, without counting them.
+
+    On PostgreSQL the estimate is the row count of the planner for the query (`EXPLAIN`), which accounts for its
+    filters. SQLite has no row estimates, the table size recorded by `ANALYZE` in `sqlite_stat1` is used instead,
+    read from the row of the table itself or of one of its indexes that is not partial (a partial index only counts
+    the rows matching its condition).
+
+    Args:
+        queryset (QuerySet): The queryset.
+
+    Returns:
+        int: The estimated number of rows, or None if the database has no estimate.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        if connection.vendor == "sqlite":
+            table = queryset.model._meta.db_table
+            try:
+                cursor.execute("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            except Exception:
+                return None
+            stats = cursor.fetchall()
+            cursor.execute(f"PRAGMA index_list({connection.ops.quote_name(table)})")
+            partial_indexes = {row[1] for row in cursor.fetchall() if row[4]}
+            for index, stat in stats:
+                if index not in partial_indexes:
+                    return int(stat.split()[0])
+            return None
+    return None
+
+
+class EstimatedPage(Page):
+    """
+    A page of a paginator whose count is an estimate, knowing whether there is a next page from its own rows.
+    """
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts the rows exactly only up to a threshold.
+
+    The rows are first counted with a `LIMIT threshold + 1` subquery, which costs the same however large the table
+    is. Lists with more rows use the estimate of `estimate_count` and their pages are read without being bounded by
+    the estimated count, one more row being read to know whether there is a next page.
+    """
+
+    def __init__(self, object_list, per_page, threshold, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.threshold = threshold
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        bounded_count = self.object_list[: self.threshold + 1].count()
+        if bounded_count <= self.threshold:
+            return bounded_count
+        estimate = estimate_count(self.object_list)
+        if estimate is None:
+            return self.object_list.count()
+        self.count_is_estimate = True
+        return max(estimate, bounded_count)
+
+    def validate_number(self, number):
+        if not (self.count and self.count_is_estimate):
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number)
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return EstimatedPage(rows[: self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination whose count is estimated by the database for lists above
+    `PAGINATION_ESTIMATED_COUNT_THRESHOLD` rows, see `EstimatedCountPaginator`.
+
+    The response has the keys of `PageNumberPagination` and a `count_is_estimate` flag.
+    """
+
+    def __init__(self):
+        """
+        EstimatedCountPagination class constructor
+        """
+        self.threshold = settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+
+    def django_paginator_class(self, object_list, per_page, **kwargs):
+        return EstimatedCountPaginator(object_list, per_page, threshold=self.threshold, **kwargs)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.page.paginator.count),
+                    ("count_is_estimate", self.page.paginator.count_is_estimate),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_estimate"] = {"type": "boolean"}
+        return response_schema
+
+
+class SelectablePagination(EstimatedCountPagination):
+    """
+    The default pagination of the API, selected per request.
+
+    Requests are paginated by page number (`?page=`, with `EstimatedCountPagination`), so existing API clients keep
+    working, unless they ask for keyset pagination with `?pagination=cursor` or send a `cursor`, in which case
+    `KeysetPagination` is used.
+    """
+
+    pagination_query_param = "pagination"
+
+    def __init__(self):
+        """
+        SelectablePagination class constructor
+        """
+        super().__init__()
+        self.keyset = None
+
+    def uses_keyset(self, request):
+        """
+        Returns whether the request asks for keyset pagination.
+        """
+        return (
+            request.query_params.get(self.pagination_query_param) == "cursor"
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.uses_keyset(request):
+            self.keyset = KeysetPagination(page_size=self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
@@ -0,0 +1,115 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from rest_framework import serializers
+
+# Fields whose representation of a database value is the value itself
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """
+    Fast read-only counterpart of a `ModelSerializer`, for list endpoints.
+
+    Instead of building a model instance per row and walking the serializer fields of every row, only the columns of
+    the serializer fields are queried with `values()`, and every row is converted with converters compiled once from
+    the serializer fields: the value is kept as is for the fields whose representation of a database value is the
+    value itself (booleans, strings, choices, integers and primary keys), and the bound `to_representation` of the
+    field is used for the others (dates). The rendered output is the same as the one of the `ModelSerializer`.
+
+    Only concrete model fields, forward foreign keys represented by their primary key, and queryset annotations (read
+    by the name of the serializer field source) are supported.
+
+    Example Usage:
+
+    transaction_values = ValuesSerializer(TransactionReadSerializer)
+    rows = transaction_values.values(Transaction.objects.all())
+    data = transaction_values.to_representation(rows[:20])
+    """
+
+    def __init__(self, serializer_class):
+        """
+        ValuesSerializer class constructor
+
+        Args:
+            serializer_class (ModelSerializer): The serializer whose output is reproduced.
+        """
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def converters(self):
+        """
+        Compiles the (field name, column, converter) of every serializer field, the converter being None when the
+        value is kept as is.
+        """
+        model = self.serializer_class.Meta.model
+        converters = []
+        for field_name, field in self.serializer_class().fields.items():
+            try:
+                column = model._meta.get_field(field.source).attname
+            except FieldDoesNotExist:
+                column = field.source
+            converter = None if isinstance(field, IDENTITY_FIELDS) else field.to_representation
+            converters.append((field_name, column, converter))
+        return converters
+
+    @property
+    def field_names(self):
+        """
+        Returns the names of the serializer fields.
+        """
+        return [field_name for field_name, _, _ in self.converters]
+
+    @property
+    def columns(self):
+        """
+        Returns the columns read for the serializer fields.
+        """
+        return [column for _, column, _ in self.converters]
+
+    def values(self, queryset):
+        """
+        Restricts a queryset to the columns of the serializer fields.
+
+        Args:
+            queryset (QuerySet): The model queryset.
+
+        Returns:
+            QuerySet: The queryset of row dicts.
+        """
+        return queryset.values(*self.columns)
+
+    def to_representation(self, rows):
+        """
+        Converts rows read with `values` into the representation of the serializer.
+
+        Args:
+            rows (iterable): The row dicts.
+
+        Returns:
+            list: The representation of every row.
+        """
+        return list(self.iter_representation(rows))
+
+    def iter_representation(self, rows):
+        """
+        Converts rows read with `values` one at a time, for streamed responses.
+
+        Args:
+            rows (iterable): The row dicts.
+
+        Returns:
+            generator: The representation of every row.
+        """
+        converters = self.converters
+        for row in rows:
+            item = {}
+            for field_name, column, converter in converters:
+                value = row[column]
+                item[field_name] = value if converter is None or value is None else converter(value)
+            yield item
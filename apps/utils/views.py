@@ -0,0 +1,112 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.utils.cache import MeteredCache
+from apps.utils.pagination import KeysetPagination, SelectablePagination
+
+
+class CacheStatsView(APIView):
+    """
+    A view for reading the hit and miss counters of every `MeteredCache`.
+
+    Outputs:
+    - response: The HTTP response object with the stats of each cache by namespace.
+    """
+
+    def get(self, request):
+        """
+        Handles GET requests to read the cache counters.
+
+        Inputs:
+        - request: The HTTP request object.
+
+        Outputs:
+        - response: The HTTP response object containing the stats of each cache and status code.
+        """
+        data = {namespace: cache.stats() for namespace, cache in MeteredCache.registry.items()}
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin for generic views of `BaseModel` subclasses that answers conditional GET requests.
+
+    The validators are computed with a single aggregate query, before any row is fetched or serialized: the
+    `updated_at` of the row for detail requests, and the maximum `updated_at` and the number of rows of the filtered
+    queryset for list requests. The number of rows changes when a row is created, soft deleted or deleted, and
+    `updated_at` when a row is saved. The ETag of a list also includes its pagination query parameters, so the
+    ETag of a page never validates another page.
+
+    Lists have validators only when they are counted exactly by `EstimatedCountPagination`, with at most
+    `PAGINATION_ESTIMATED_COUNT_THRESHOLD` rows, so the aggregate costs no more than the count of the page. Keyset
+    paginated and larger lists, whose pages must cost the same however large the list is, are never validated.
+
+    Requests whose `If-None-Match` (or `If-Modified-Since`) validators still match are answered with
+    `304 Not Modified`, and `200` responses carry the `ETag` and `Last-Modified` headers. The validators of the
+    request are kept in `validators`.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handles GET requests, answering `304 Not Modified` when the client copy is still current.
+        """
+        etag, last_modified = self.validators = self.get_validators()
+        if etag is not None:
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return not_modified
+        response = super().get(request, *args, **kwargs)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_validators(self):
+        """
+        Computes the validators of the requested row or list.
+
+        Returns:
+            tuple: The ETag and the last modification timestamp, (None, None) if the requested row does not exist, the
+            list is empty or it is not validated.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is not None:
+            queryset = queryset.filter(**{self.lookup_field: lookup})
+            pagination = ""
+        else:
+            paginator = self.paginator
+            if isinstance(paginator, KeysetPagination) or (
+                isinstance(paginator, SelectablePagination) and paginator.uses_keyset(self.request)
+            ):
+                return None, None
+            threshold = settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+            if queryset[: threshold + 1].count() > threshold:
+                return None, None
+            pagination = self.get_pagination_key()
+        validators = queryset.aggregate(updated_at=Max("updated_at"), count=Count("pk"))
+        if validators["updated_at"] is None:
+            return None, None
+        updated_at = validators["updated_at"].timestamp()
+        return quote_etag(f"{validators['count']}-{updated_at:.6f}{pagination}"), int(updated_at)
+
+    def get_pagination_key(self):
+        """
+        Returns the ETag suffix identifying the requested page, a digest of the pagination query parameters.
+        """
+        paginator = self.paginator
+        names = (
+            getattr(paginator, "page_query_param", None),
+            getattr(paginator, "page_size_query_param", None),
+        )
+        params = sorted((name, self.request.query_params[name]) for name in names if name in self.request.query_params)
+        if not params:
+            return ""
+        return "-" + hashlib.sha256(repr(params).encode()).hexdigest()[:16]
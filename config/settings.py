@@ -32,7 +32,7 @@ ALLOWED_HOSTS = []
 
 # Application definition
 
-LOCAL_APPS = ["apps.users", "apps.transactions"]
+LOCAL_APPS = ["apps.utils", "apps.users", "apps.transactions"]
 
 THIRD_PARTY_APPS = [
     "corsheaders",
@@ -125,11 +125,44 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAdminUser',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.utils.pagination.SelectablePagination',
     "PAGE_SIZE": 20,
 }
+# Page number lists above this number of rows report the database estimate of their count instead of counting them
+PAGINATION_ESTIMATED_COUNT_THRESHOLD = int(os.getenv("PAGINATION_ESTIMATED_COUNT_THRESHOLD", 10000))
 AUTH_USER_MODEL = "users.User"
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# The validation, clients and responses caches can use the local-memory cache or, to share them among processes, the
+# file based cache ("django.core.cache.backends.filebased.FileBasedCache" with a directory as LOCATION). With the
+# local-memory cache, the responses cache is only invalidated by the writes of the same process.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "validation": {
+        "BACKEND": os.getenv("VALIDATION_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("VALIDATION_CACHE_LOCATION", "validation"),
+        "TIMEOUT": int(os.getenv("VALIDATION_CACHE_TIMEOUT", 600)),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("VALIDATION_CACHE_MAX_ENTRIES", 1000))},
+    },
+    "clients": {
+        "BACKEND": os.getenv("CLIENTS_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CLIENTS_CACHE_LOCATION", "clients"),
+        "TIMEOUT": int(os.getenv("CLIENTS_CACHE_TIMEOUT", 300)),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CLIENTS_CACHE_MAX_ENTRIES", 10000))},
+    },
+    "responses": {
+        "BACKEND": os.getenv("RESPONSES_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("RESPONSES_CACHE_LOCATION", "responses"),
+        "TIMEOUT": int(os.getenv("RESPONSES_CACHE_TIMEOUT", 300)),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("RESPONSES_CACHE_MAX_ENTRIES", 1000))},
+    },
+}
+CLIENTS_CACHE_NEGATIVE_TIMEOUT = int(os.getenv("CLIENTS_CACHE_NEGATIVE_TIMEOUT", 30))
+
 LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
@@ -176,7 +209,39 @@ ALLOWED_HOSTS = ["*"]
 
 STATIC_URL = 'static/'
 
+# Set to "apps.transactions.storage.ContentAddressedStorage" to deduplicate the transaction images by content, or to
+# "apps.transactions.storage.PackFileStorage" to append them to large segment files read through memory maps
+DEFAULT_FILE_STORAGE = os.getenv("DEFAULT_FILE_STORAGE", "django.core.files.storage.FileSystemStorage")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Clients
+
+CLIENTS_IMPORT_BATCH_SIZE = int(os.getenv("CLIENTS_IMPORT_BATCH_SIZE", 1000))
+CLIENTS_IMPORT_MAX_ERRORS = int(os.getenv("CLIENTS_IMPORT_MAX_ERRORS", 1000))
+
+# Transactions
+
+TRANSACTIONS_VALIDATE_BATCH_MAX_SIZE = int(os.getenv("TRANSACTIONS_VALIDATE_BATCH_MAX_SIZE", 100))
+TRANSACTIONS_WORKER_POOL_SIZE = int(os.getenv("TRANSACTIONS_WORKER_POOL_SIZE", 2))
+TRANSACTIONS_VALIDATION_CACHE_ENABLED = os.getenv("TRANSACTIONS_VALIDATION_CACHE_ENABLED", "true").lower() == "true"
+TRANSACTIONS_IMAGE_VERIFY_PROCESSES = int(os.getenv("TRANSACTIONS_IMAGE_VERIFY_PROCESSES", 0))
+TRANSACTIONS_IMAGE_NORMALIZATION = {
+    "ENABLED": os.getenv("TRANSACTIONS_IMAGE_NORMALIZATION_ENABLED", "false").lower() == "true",
+    "FORMATS": ("bmp", "png"),
+    "FORMAT": os.getenv("TRANSACTIONS_IMAGE_NORMALIZATION_FORMAT", "jpeg"),
+    "QUALITY": int(os.getenv("TRANSACTIONS_IMAGE_NORMALIZATION_QUALITY", 85)),
+    "MAX_WIDTH": int(os.getenv("TRANSACTIONS_IMAGE_NORMALIZATION_MAX_WIDTH", 0)),
+    "MAX_HEIGHT": int(os.getenv("TRANSACTIONS_IMAGE_NORMALIZATION_MAX_HEIGHT", 0)),
+    "STRIP_METADATA": True,
+}
+TRANSACTIONS_FAILED_WRITER = {
+    "ENABLED": os.getenv("TRANSACTIONS_FAILED_WRITER_ENABLED", "false").lower() == "true",
+    "BATCH_SIZE": int(os.getenv("TRANSACTIONS_FAILED_WRITER_BATCH_SIZE", 100)),
+    "FLUSH_INTERVAL": float(os.getenv("TRANSACTIONS_FAILED_WRITER_FLUSH_INTERVAL", 1.0)),
+    "SPOOL_DIR": os.getenv("TRANSACTIONS_FAILED_WRITER_SPOOL_DIR", BASE_DIR / "spool"),
+}
+TRANSACTIONS_PACK_SEGMENT_SIZE = int(os.getenv("TRANSACTIONS_PACK_SEGMENT_SIZE", 256 * 1024 * 1024))
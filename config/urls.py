@@ -4,6 +4,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from apps.utils.views import CacheStatsView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Validater Microservice",
@@ -24,6 +26,7 @@ urlpatterns = [
     path("auth/", include("djoser.urls.authtoken")),
     path("api/", include("apps.users.urls")),
     path("api/", include("apps.transactions.urls")),
+    path("api/cache/stats/", CacheStatsView.as_view()),
 ]
 
 docs_urlpatterns = [